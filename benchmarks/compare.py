@@ -0,0 +1,83 @@
+"""Compare two benchmark result files written by benchmarks.run.
+
+Usage::
+
+    python3 -m benchmarks.compare old.json new.json
+
+For each run and microbenchmark, print the old and new values and their
+ratio.
+
+"""
+
+import json
+
+
+METRICS = [
+        "value",
+        "nodes_per_second",
+        "maximum_size_of_the_queue",
+        "peak_rss",
+        "time_to_first_solution",
+        "time_to_target",
+        ]
+
+
+def ratio(old, new):
+    if old is None or new is None or old == 0:
+        return ""
+    return '{:.3f}'.format(new / old)
+
+
+def display(value):
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return '{:.6g}'.format(value)
+    return str(value)
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='')
+    parser.add_argument("old", type=str, help='reference results')
+    parser.add_argument("new", type=str, help='compared results')
+    args = parser.parse_args()
+
+    with open(args.old) as json_file:
+        old = json.load(json_file)
+    with open(args.new) as json_file:
+        new = json.load(json_file)
+
+    print(f"Old revision: {old.get('revision')}")
+    print(f"New revision: {new.get('revision')}")
+    print()
+    print(
+            '{:<40}'.format("Run")
+            + '{:<26}'.format("Metric")
+            + '{:>14}'.format("Old")
+            + '{:>14}'.format("New")
+            + '{:>8}'.format("Ratio"))
+    old_results = {
+            (result["instance"], result["algorithm"]): result
+            for result in old["results"]}
+    for result in new["results"]:
+        key = (result["instance"], result["algorithm"])
+        if key not in old_results:
+            continue
+        old_result = old_results[key]
+        for metric in METRICS:
+            print(
+                    '{:<40}'.format(" ".join(key))
+                    + '{:<26}'.format(metric)
+                    + '{:>14}'.format(display(old_result.get(metric)))
+                    + '{:>14}'.format(display(result.get(metric)))
+                    + '{:>8}'.format(
+                        ratio(old_result.get(metric), result.get(metric))))
+    print()
+    for name, value in new["microbenchmarks"].items():
+        old_value = old["microbenchmarks"].get(name)
+        print(
+                '{:<66}'.format(name + " (s/op)")
+                + '{:>14}'.format(display(old_value))
+                + '{:>14}'.format(display(value))
+                + '{:>8}'.format(ratio(old_value, value)))
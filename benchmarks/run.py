@@ -0,0 +1,245 @@
+"""Benchmarks of the algorithms on a fixed set of seeded TSP instances.
+
+Usage::
+
+    python3 -m benchmarks.run -o results.json
+    python3 -m benchmarks.compare old.json new.json
+
+Each algorithm is run on each instance in a fresh process, so that the peak
+resident memory of the run can be measured. The results are written as JSON.
+
+"""
+
+import treesearchsolverpy
+from treesearchsolverpy.commons import SolutionPool, \
+                                       History, \
+                                       add_to_history_and_queue, \
+                                       remove_from_history_and_queue
+from examples.travellingsalesman import Instance, BranchingScheme
+
+import sys
+import json
+import time
+import random
+import platform
+import resource
+import subprocess
+import multiprocessing
+from sortedcontainers import SortedList
+
+
+ALGORITHMS = [
+        "greedy",
+        "best_first_search",
+        "iterative_beam_search",
+        ]
+
+INSTANCE_SIZES = [10, 20, 50, 100]
+
+INSTANCE_SEEDS = [0, 1]
+
+
+def generate_instance(number_of_locations, seed):
+    rng = random.Random(1000 * number_of_locations + seed)
+    instance = Instance()
+    for _ in range(number_of_locations):
+        instance.add_location(rng.randint(0, 1000), rng.randint(0, 1000))
+    return instance
+
+
+class RecordingSolutionPool(SolutionPool):
+    """Solution pool recording the time and the value of each new best
+    solution."""
+
+    def __init__(self, branching_scheme, maximum_size, start):
+        super().__init__(branching_scheme, maximum_size)
+        self.start = start
+        self.timeline = []
+
+    def add(self, node):
+        best = self.best
+        if not super().add(node):
+            return False
+        if self.best is not best:
+            self.timeline.append((
+                time.monotonic() - self.start,
+                float(self.branching_scheme.display(self.best))))
+        return True
+
+
+def peak_rss():
+    maximum_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return maximum_rss
+    return maximum_rss * 1024
+
+
+def run_algorithm(arguments):
+    number_of_locations, seed, algorithm, time_limit = arguments
+    instance = generate_instance(number_of_locations, seed)
+    branching_scheme = BranchingScheme(instance)
+    start = time.monotonic()
+    solution_pool = RecordingSolutionPool(branching_scheme, 1, start)
+    output = getattr(treesearchsolverpy, algorithm)(
+            branching_scheme,
+            solution_pool=solution_pool,
+            time_limit=time_limit,
+            verbose=False)
+    elapsed_time = output["elapsed_time"]
+    return {
+            "instance": f"tsp_{number_of_locations}_{seed}",
+            "algorithm": algorithm,
+            "value": (
+                solution_pool.timeline[-1][1]
+                if solution_pool.timeline else None),
+            "number_of_nodes": output["number_of_nodes"],
+            "elapsed_time": elapsed_time,
+            "nodes_per_second": (
+                output["number_of_nodes"] / elapsed_time
+                if elapsed_time > 0 else None),
+            "maximum_size_of_the_queue": output.get(
+                "maximum_size_of_the_queue"),
+            "peak_rss": peak_rss(),
+            "timeline": solution_pool.timeline,
+            }
+
+
+def time_to_target(timeline, target):
+    for t, value in timeline:
+        if value <= target:
+            return t
+    return None
+
+
+def microbenchmarks(number_of_operations):
+    """Return the time per operation, in seconds, of the dominance history
+    and solution pool primitives."""
+    instance = generate_instance(50, 0)
+    branching_scheme = BranchingScheme(instance)
+    rng = random.Random(0)
+    # Random nodes of depth 2 to 4.
+    nodes = []
+    while len(nodes) < number_of_operations:
+        node = branching_scheme.root()
+        for _ in range(rng.randint(2, 4)):
+            children = branching_scheme.next_children(node)
+            node = rng.choice(children)
+        nodes.append(node)
+    # Complete tours.
+    solutions = []
+    while len(solutions) < number_of_operations:
+        node = branching_scheme.root()
+        while not branching_scheme.leaf(node):
+            node = rng.choice(branching_scheme.next_children(node))
+        solutions.append(node)
+
+    results = {}
+
+    history = History(branching_scheme)
+    queue = SortedList()
+    start = time.perf_counter()
+    for node in nodes:
+        add_to_history_and_queue(branching_scheme, history, queue, node)
+    results["add_to_history_and_queue"] = (
+            (time.perf_counter() - start) / len(nodes))
+
+    number_of_removals = len(queue)
+    start = time.perf_counter()
+    while queue:
+        remove_from_history_and_queue(branching_scheme, history, queue, 0)
+    results["remove_from_history_and_queue"] = (
+            (time.perf_counter() - start) / max(number_of_removals, 1))
+
+    for maximum_pool_size in [1, 100]:
+        solution_pool = SolutionPool(branching_scheme, maximum_pool_size)
+        start = time.perf_counter()
+        for solution in solutions:
+            solution_pool.add(solution)
+        results[f"SolutionPool.add (size {maximum_pool_size})"] = (
+                (time.perf_counter() - start) / len(solutions))
+
+    return results
+
+
+def revision():
+    try:
+        return subprocess.run(
+                ["git", "rev-parse", "HEAD"],
+                capture_output=True,
+                text=True,
+                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='')
+    parser.add_argument(
+            "-o", "--output",
+            type=str,
+            default="benchmark_results.json",
+            help='path of the JSON output file')
+    parser.add_argument(
+            "-t", "--time-limit",
+            type=float,
+            default=5,
+            help='time limit of each run, in seconds')
+    parser.add_argument(
+            "-g", "--gap",
+            type=float,
+            default=1,
+            help='gap (in percent) to the best known value used for the '
+                 'time to target')
+    parser.add_argument(
+            "-n", "--number-of-operations",
+            type=int,
+            default=10000,
+            help='number of operations of the microbenchmarks')
+
+    args = parser.parse_args()
+
+    tasks = [
+            (number_of_locations, seed, algorithm, args.time_limit)
+            for number_of_locations in INSTANCE_SIZES
+            for seed in INSTANCE_SEEDS
+            for algorithm in ALGORITHMS]
+    # Run each algorithm in a new process.
+    context = multiprocessing.get_context("spawn")
+    results = []
+    with context.Pool(1, maxtasksperchild=1) as pool:
+        for result in pool.imap(run_algorithm, tasks):
+            print(
+                    f"{result['instance']:<12}"
+                    f"{result['algorithm']:<24}"
+                    f"{str(result['value']):>12}"
+                    f"{result['number_of_nodes']:>12}")
+            results.append(result)
+
+    # Compute times to target from the best value found on each instance.
+    best_values = {}
+    for result in results:
+        if result["value"] is not None:
+            best_values[result["instance"]] = min(
+                    result["value"],
+                    best_values.get(result["instance"], float('inf')))
+    for result in results:
+        best_value = best_values.get(result["instance"])
+        timeline = result["timeline"]
+        result["time_to_first_solution"] = (
+                timeline[0][0] if timeline else None)
+        result["time_to_target"] = (
+                time_to_target(
+                    timeline, best_value * (1 + args.gap / 100))
+                if best_value is not None else None)
+
+    data = {
+            "revision": revision(),
+            "python": platform.python_version(),
+            "time_limit": args.time_limit,
+            "gap": args.gap,
+            "results": results,
+            "microbenchmarks": microbenchmarks(args.number_of_operations),
+            }
+    with open(args.output, 'w') as json_file:
+        json.dump(data, json_file, indent=4)
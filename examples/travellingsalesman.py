@@ -1,45 +1,221 @@
 import treesearchsolverpy
+from treesearchsolverpy.arena import LineageStore
 
+import sys
 import json
 import math
+import mmap
+import array
+import struct
+import functools
 from functools import total_ordering
 
 
-class Location:
-    id = -1
-    x = 0
-    y = 0
+# Binary instance format, little-endian:
+# * header: magic, version, number of locations n, flags
+# * xs: n int32
+# * ys: n int32
+# * if flags & BINARY_DISTANCE_MATRIX: distance matrix, n * n int64
+BINARY_MAGIC = b"TSPB"
+BINARY_VERSION = 1
+BINARY_HEADER = struct.Struct("<4sIQI4x")
+BINARY_DISTANCE_MATRIX = 1
 
 
-class Instance:
+class DistanceMatrix:
+    """Rows of a distance matrix stored contiguously in a memoryview."""
+
+    def __init__(self, distances, number_of_locations):
+        self.distances = distances
+        self.n = number_of_locations
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, location_id):
+        n = self.n
+        return self.distances[location_id * n:(location_id + 1) * n]
+
+
+class ComputedDistanceMatrix:
+    """Rows of a distance matrix computed from the coordinates when they
+    are accessed. The most recently accessed rows are cached, within
+    'cache_size' bytes; a row takes 8 n bytes."""
+
+    def __init__(self, xs, ys, cache_size=1 << 24):
+        self.xs = xs
+        self.ys = ys
+        self.cache_size = cache_size
+        maximum_number_of_rows = max(1, cache_size // (8 * max(1, len(xs))))
+        self.row = functools.lru_cache(maxsize=maximum_number_of_rows)(
+                self.compute_row)
+
+    def __len__(self):
+        return len(self.xs)
+
+    def __getitem__(self, location_id):
+        return self.row(location_id)
+
+    def __reduce__(self):
+        # The cache is not sent.
+        return (ComputedDistanceMatrix, (self.xs, self.ys, self.cache_size))
+
+    def compute_row(self, location_id):
+        x1 = self.xs[location_id]
+        y1 = self.ys[location_id]
+        return array.array('q', [
+            round(math.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2))
+            for x2, y2 in zip(self.xs, self.ys)])
+
 
-    def __init__(self, filepath=None):
-        self.locations = []
+class Instance:
+    """Instance of the Travelling Salesman Problem.
+
+    Instances are read from a JSON file or from a binary file (see
+    'write_binary'). Binary files are memory-mapped: the coordinates and
+    the distance matrix are read from the mapped pages, which are shared by
+    all the processes reading the same file. If a binary file doesn't
+    contain a distance matrix, the distances are computed from the
+    coordinates. When an instance read from a binary file is sent to
+    another process, only its path is sent and the file is mapped again.
+
+    If 'distance_matrix' is False, the distance matrix of a JSON instance is
+    not computed when it is read, and the distances are computed from the
+    coordinates as well.
+
+    """
+
+    def __init__(self, filepath=None, distance_matrix=True):
+        self.xs = []
+        self.ys = []
+        # Distance matrix, distances[j1][j2] is the distance between
+        # locations j1 and j2.
+        self.distances = []
+        # distance(j1, j2), bound to the accessor matching 'distances'.
+        self.distance = self.distance_from_matrix
+        # Path of the binary file, if the instance has been read from one.
+        self.binary_filepath = None
         if filepath is not None:
-            with open(filepath) as json_file:
-                data = json.load(json_file)
-                locations = zip(
-                        data["xs"],
-                        data["ys"])
-                for (x, y) in locations:
-                    self.add_location(x, y)
+            with open(filepath, "rb") as file:
+                magic = file.read(len(BINARY_MAGIC))
+            if magic == BINARY_MAGIC:
+                self.read_binary(filepath)
+            else:
+                with open(filepath) as json_file:
+                    data = json.load(json_file)
+                    self.xs = list(data["xs"])
+                    self.ys = list(data["ys"])
+                if distance_matrix:
+                    self.compute_distances()
+                else:
+                    self.use_computed_distances()
+
+    def __getstate__(self):
+        if self.binary_filepath is not None:
+            return {"binary_filepath": self.binary_filepath}
+        return self.__dict__
+
+    def __setstate__(self, state):
+        if "xs" not in state:
+            self.__init__(state["binary_filepath"])
+        else:
+            self.__dict__.update(state)
+
+    def read_binary(self, filepath):
+        if sys.byteorder != "little":
+            raise ValueError("Binary instances require a little-endian host.")
+        with open(filepath, "rb") as file:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(data) < BINARY_HEADER.size:
+            raise ValueError(f"Truncated binary instance '{filepath}'.")
+        magic, version, n, flags = BINARY_HEADER.unpack_from(data)
+        if version != BINARY_VERSION:
+            raise ValueError(
+                    f"Unsupported binary instance version in '{filepath}'.")
+        offset = BINARY_HEADER.size
+        size = offset + 8 * n
+        if flags & BINARY_DISTANCE_MATRIX:
+            size += 8 * n * n
+        if len(data) != size:
+            raise ValueError(f"Invalid size of binary instance '{filepath}'.")
+        view = memoryview(data)
+        self.xs = view[offset:offset + 4 * n].cast('i')
+        offset += 4 * n
+        self.ys = view[offset:offset + 4 * n].cast('i')
+        offset += 4 * n
+        if flags & BINARY_DISTANCE_MATRIX:
+            self.distances = DistanceMatrix(view[offset:].cast('q'), n)
+        else:
+            self.use_computed_distances()
+        self.binary_filepath = filepath
+
+    def write_binary(self, filepath, distance_matrix=False):
+        """Write the instance in the binary format.
+
+        If 'distance_matrix' is True, the distance matrix is written as
+        well; it takes 8 n^2 bytes. It is written row by row, so an instance
+        without a distance matrix only computes one row at a time.
+
+        """
+        n = self.number_of_locations()
+        flags = BINARY_DISTANCE_MATRIX if distance_matrix else 0
+        xs = array.array('i', self.xs)
+        ys = array.array('i', self.ys)
+        if sys.byteorder != "little":
+            xs.byteswap()
+            ys.byteswap()
+        with open(filepath, "wb") as file:
+            file.write(BINARY_HEADER.pack(
+                BINARY_MAGIC, BINARY_VERSION, n, flags))
+            file.write(xs.tobytes())
+            file.write(ys.tobytes())
+            if distance_matrix:
+                for location_id in range(n):
+                    row = array.array('q', self.distances[location_id])
+                    if sys.byteorder != "little":
+                        row.byteswap()
+                    file.write(row.tobytes())
+
+    def number_of_locations(self):
+        return len(self.xs)
+
+    def use_computed_distances(self):
+        self.distances = ComputedDistanceMatrix(self.xs, self.ys)
+        self.distance = self.distance_from_coordinates
+
+    def compute_distances(self):
+        xs = self.xs
+        ys = self.ys
+        self.distances = [
+                array.array('q', [
+                    round(math.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2))
+                    for x2, y2 in zip(xs, ys)])
+                for x1, y1 in zip(xs, ys)]
 
     def add_location(self, x, y):
-        location = Location()
-        location.id = len(self.locations)
-        location.x = x
-        location.y = y
-        self.locations.append(location)
-
-    def distance(self, location_id_1, location_id_2):
-        xd = self.locations[location_id_2].x - self.locations[location_id_1].x
-        yd = self.locations[location_id_2].y - self.locations[location_id_1].y
-        d = round(math.sqrt(xd * xd + yd * yd))
-        return d
+        self.xs.append(x)
+        self.ys.append(y)
+        # Update the distance matrix.
+        row = array.array('q', [
+            round(math.sqrt((x2 - x) ** 2 + (y2 - y) ** 2))
+            for x2, y2 in zip(self.xs, self.ys)])
+        for location_id, distances in enumerate(self.distances):
+            distances.append(row[location_id])
+        self.distances.append(row)
+
+    def distance_from_matrix(self, location_id_1, location_id_2):
+        return self.distances[location_id_1][location_id_2]
+
+    def distance_from_coordinates(self, location_id_1, location_id_2):
+        x1 = self.xs[location_id_1]
+        y1 = self.ys[location_id_1]
+        x2 = self.xs[location_id_2]
+        y2 = self.ys[location_id_2]
+        return round(math.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2))
 
     def write(self, filepath):
-        data = {"xs": [location.x for location in self.locations],
-                "ys": [location.y for location in self.locations]}
+        data = {"xs": list(self.xs),
+                "ys": list(self.ys)}
         with open(filepath, 'w') as json_file:
             json.dump(data, json_file)
 
@@ -47,7 +223,7 @@ class Instance:
         print("Checker")
         print("-------")
         with open(filepath) as json_file:
-            n = len(self.locations)
+            n = self.number_of_locations()
             data = json.load(json_file)
             locations = data["locations"]
             length = 0
@@ -79,8 +255,13 @@ class BranchingScheme:
 
         id : int
             Unique id, given by the BranchingScheme.
-        father : Node or None
-            father of the nodes, None if it is the root node.
+        father_lineage : handle or None
+            lineage of the partial tour of the father of the node in the
+            LineageStore of the BranchingScheme, None for the root node and
+            its children.
+        lineage : handle or None
+            lineage of the partial tour of the node, built by node_lineage
+            when it is needed.
         visited : int
             bitset implemented with an int to store the visited
             locations of the partial tour.
@@ -102,7 +283,8 @@ class BranchingScheme:
         """
 
         id = None
-        father = None
+        father_lineage = None
+        lineage = None
         visited = None
         number_of_locations = None
         j = None
@@ -118,11 +300,23 @@ class BranchingScheme:
     def __init__(self, instance):
         self.instance = instance
         self.id = 0
+        # The partial tour of a node is stored as a lineage whose moves are
+        # its locations, so that nodes don't reference their father.
+        self.lineages = LineageStore()
+
+    def node_lineage(self, node):
+        # The lineage of a node is only built when the node is expanded or
+        # when its solution is needed, not for each child generated.
+        lineage = node.lineage
+        if lineage is None and node.number_of_locations > 1:
+            lineage = self.lineages.extend(node.father_lineage, node.j)
+            node.lineage = lineage
+        return lineage
 
     def root(self):
         # The root node contains only location 0.
         node = self.Node()
-        node.father = None
+        node.father_lineage = None
         node.visited = (1 << 0)
         node.number_of_locations = 1
         node.j = 0
@@ -142,7 +336,7 @@ class BranchingScheme:
             return None
         # Build child node.
         child = self.Node()
-        child.father = father
+        child.father_lineage = self.node_lineage(father)
         child.visited = father.visited + (1 << j_next)
         child.number_of_locations = father.number_of_locations + 1
         child.j = j_next
@@ -152,15 +346,58 @@ class BranchingScheme:
         self.id += 1
         return child
 
+    def next_children(self, father):
+        # Generate all the remaining children at once.
+        number_of_locations = self.instance.number_of_locations()
+        visited = father.visited
+        # Evaluate all the children with the row of the distance matrix of
+        # the last visited location.
+        distances = self.instance.distances[father.j]
+        length = father.length
+        father_lineage = self.node_lineage(father)
+        children_locations = [
+                j_next
+                for j_next in range(
+                    father.next_child_pos, number_of_locations)
+                if not (visited >> j_next) & 1]
+        children_lengths = [
+                length + distances[j_next]
+                for j_next in children_locations]
+        children = []
+        for j_next, child_length in zip(
+                children_locations, children_lengths):
+            # Build child node.
+            child = self.Node()
+            child.father_lineage = father_lineage
+            child.visited = visited + (1 << j_next)
+            child.number_of_locations = father.number_of_locations + 1
+            child.j = j_next
+            child.length = child_length
+            child.guide = child_length
+            child.id = self.id
+            self.id += 1
+            children.append(child)
+        # Update node.next_child_pos.
+        father.next_child_pos = number_of_locations
+        return children
+
     def infertile(self, node):
-        return node.next_child_pos == len(self.instance.locations)
+        return node.next_child_pos == self.instance.number_of_locations()
 
     def leaf(self, node):
-        return node.number_of_locations == len(self.instance.locations)
+        return node.number_of_locations == self.instance.number_of_locations()
+
+    def key(self, node):
+        # Same order as Node.__lt__.
+        return (node.guide, node.id)
+
+    # Nodes are sorted by length, and a node is bounded if its length is
+    # greater than the value of the solution.
+    monotone_bound = True
 
     def bound(self, node_1, node_2):
         # Check if node_2 is feasible.
-        if node_2.number_of_locations < len(self.instance.locations):
+        if node_2.number_of_locations < self.instance.number_of_locations():
             return False
         d2 = node_2.length + self.instance.distance(node_2.j, 0)
         return node_1.length >= d2
@@ -169,10 +406,10 @@ class BranchingScheme:
 
     def better(self, node_1, node_2):
         # Check if node_1 is feasible.
-        if node_1.number_of_locations < len(self.instance.locations):
+        if node_1.number_of_locations < self.instance.number_of_locations():
             return False
         # Check if node_2 is feasible.
-        if node_2.number_of_locations < len(self.instance.locations):
+        if node_2.number_of_locations < self.instance.number_of_locations():
             return True
         # Compute the objective value of node_1.
         d1 = node_1.length + self.instance.distance(node_1.j, 0)
@@ -181,7 +418,37 @@ class BranchingScheme:
         return d1 < d2
 
     def equals(self, node_1, node_2):
-        return False
+        if node_1.length != node_2.length:
+            return False
+        return self.to_solution(node_1) == self.to_solution(node_2)
+
+    def solution_hash(self, node):
+        return hash(tuple(self.to_solution(node)))
+
+    def goal_node(self, value):
+        # Complete tour of length 'value', used to compare solutions with it.
+        node = self.Node()
+        node.number_of_locations = self.instance.number_of_locations()
+        node.j = 0
+        node.length = value
+        node.guide = value
+        return node
+
+    def from_solution(self, locations):
+        # Rebuild the node of a tour given in the format of to_solution. The
+        # records of the lineage of its father are shared with the other
+        # rebuilt nodes.
+        node = self.root()
+        if len(locations) == 0:
+            return node
+        for j_next in locations:
+            node.visited += (1 << j_next)
+            node.length += self.instance.distance(node.j, j_next)
+            node.j = j_next
+        node.number_of_locations = len(locations) + 1
+        node.guide = node.length
+        node.father_lineage = self.lineages.from_moves(locations[:-1])
+        return node
 
     # Dominances.
 
@@ -208,24 +475,39 @@ class BranchingScheme:
             return True
         return False
 
+    def dominance_key(self, node):
+        # node_1 dominates node_2 if and only if its key is smaller or equal.
+        return node.length
+
+    # Checkpoints.
+
+    def serialize_node(self, node):
+        # A node is stored as its partial tour and the position of its next
+        # child.
+        return (array.array('i', self.to_solution(node)), node.next_child_pos)
+
+    def deserialize_node(self, data):
+        locations, next_child_pos = data
+        node = self.from_solution(locations)
+        node.next_child_pos = next_child_pos
+        return node
+
     # Outputs.
 
     def display(self, node):
         # Check if node is feasible.
-        if node.number_of_locations < len(self.instance.locations):
+        if node.number_of_locations < self.instance.number_of_locations():
             return ""
         # Compute the objective value of node.
         d = node.length + self.instance.distance(node.j, 0)
         return str(d)
 
     def to_solution(self, node):
-        locations = []
-        node_tmp = node
-        while node_tmp.father is not None:
-            locations.append(node_tmp.j)
-            node_tmp = node_tmp.father
-        locations.reverse()
-        return locations
+        return self.lineages.moves(self.node_lineage(node))
+
+
+def create_branching_scheme(instance_path):
+    return BranchingScheme(Instance(instance_path))
 
 
 if __name__ == "__main__":
@@ -245,6 +527,15 @@ if __name__ == "__main__":
             type=str,
             default=None,
             help='')
+    parser.add_argument(
+            "-o", "--output",
+            type=str,
+            default=None,
+            help='path of the binary instance written by the converter')
+    parser.add_argument(
+            "--distance-matrix",
+            action="store_true",
+            help='write the distance matrix in the binary instance')
 
     args = parser.parse_args()
 
@@ -265,6 +556,11 @@ if __name__ == "__main__":
         instance = Instance(args.instance)
         instance.check(args.certificate)
 
+    elif args.algorithm == "converter":
+        # The distance matrix is only computed, row by row, if it is written.
+        instance = Instance(args.instance, distance_matrix=False)
+        instance.write_binary(args.output, args.distance_matrix)
+
     else:
         instance = Instance(args.instance)
         branching_scheme = BranchingScheme(instance)
@@ -275,10 +571,27 @@ if __name__ == "__main__":
             output = treesearchsolverpy.best_first_search(
                     branching_scheme,
                     time_limit=30)
+        elif args.algorithm == "parallel_best_first_search":
+            output = treesearchsolverpy.parallel_best_first_search(
+                    branching_scheme,
+                    time_limit=30)
         elif args.algorithm == "iterative_beam_search":
             output = treesearchsolverpy.iterative_beam_search(
                     branching_scheme,
                     time_limit=30)
+        elif args.algorithm == "iterative_memory_bounded_best_first_search":
+            output = treesearchsolverpy\
+                    .iterative_memory_bounded_best_first_search(
+                            branching_scheme,
+                            time_limit=30)
+        elif args.algorithm == "anytime_column_search":
+            output = treesearchsolverpy.anytime_column_search(
+                    branching_scheme,
+                    time_limit=30)
+        elif args.algorithm == "grasp":
+            output = treesearchsolverpy.grasp(
+                    branching_scheme,
+                    time_limit=30)
         solution = branching_scheme.to_solution(output["solution_pool"].best)
         if args.certificate is not None:
             data = {"locations": solution}
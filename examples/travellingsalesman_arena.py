@@ -0,0 +1,217 @@
+import treesearchsolverpy
+from treesearchsolverpy.arena import NodeArena
+
+from .travellingsalesman import Instance
+
+import json
+
+
+class BranchingScheme:
+    """Branching scheme for the Travelling Salesman Problem storing its nodes
+    in a NodeArena.
+
+    Nodes are integer handles. The columns of the arena are:
+
+    guide : float
+        guide of the node.
+    depth : int
+        Number of visited locations in the partial tour minus 1.
+    parent : int
+        index of the father of the node, -1 if it is the root node.
+    visited : int
+        bitset implemented with an int to store the visited
+        locations of the partial tour.
+    j : int
+        Last visited location.
+    length : int
+        length of the partial tour (without going back to location 0).
+    next_child_pos : int
+        position of the next child to generate.
+
+    Handles can't be sent to other processes, so the algorithms sending
+    nodes between processes (parallel best first search, portfolio, and
+    iterative beam search or GRASP with several workers) can't be used.
+
+    """
+
+    def __init__(self, instance):
+        self.instance = instance
+        self.arena = NodeArena(
+                visited='O',
+                j='l',
+                length='q',
+                next_child_pos='l')
+
+    def root(self):
+        # The root node contains only location 0.
+        arena = self.arena
+        node = arena.new()
+        arena.visited[node] = (1 << 0)
+        arena.j[node] = 0
+        arena.length[node] = 0
+        arena.next_child_pos[node] = 0
+        return node
+
+    def next_children(self, father):
+        arena = self.arena
+        number_of_locations = self.instance.number_of_locations()
+        visited = arena.visited[father]
+        distances = self.instance.distances[arena.j[father]]
+        length = arena.length[father]
+        children = []
+        for j_next in range(
+                arena.next_child_pos[father], number_of_locations):
+            # If this location has already been visited, skip it.
+            if (visited >> j_next) & 1:
+                continue
+            # Build child node.
+            child = arena.new(father)
+            arena.visited[child] = visited + (1 << j_next)
+            arena.j[child] = j_next
+            arena.length[child] = length + distances[j_next]
+            arena.guide[child] = arena.length[child]
+            arena.next_child_pos[child] = 0
+            children.append(child)
+        # Update node.next_child_pos.
+        arena.next_child_pos[father] = number_of_locations
+        return children
+
+    def infertile(self, node):
+        return (
+                self.arena.next_child_pos[node]
+                == self.instance.number_of_locations())
+
+    def leaf(self, node):
+        return (
+                self.arena.depth[node] + 1
+                == self.instance.number_of_locations())
+
+    def objective_value(self, node):
+        return self.arena.length[node] \
+            + self.instance.distance(self.arena.j[node], 0)
+
+    def bound(self, node_1, node_2):
+        # Check if node_2 is feasible.
+        if not self.leaf(node_2):
+            return False
+        return self.arena.length[node_1] >= self.objective_value(node_2)
+
+    # Solution pool.
+
+    def better(self, node_1, node_2):
+        # Check if node_1 is feasible.
+        if not self.leaf(node_1):
+            return False
+        # Check if node_2 is feasible.
+        if not self.leaf(node_2):
+            return True
+        return self.objective_value(node_1) < self.objective_value(node_2)
+
+    def equals(self, node_1, node_2):
+        if self.arena.length[node_1] != self.arena.length[node_2]:
+            return False
+        return self.to_solution(node_1) == self.to_solution(node_2)
+
+    def solution_hash(self, node):
+        return hash(tuple(self.to_solution(node)))
+
+    def goal_node(self, value):
+        # Complete tour of length 'value', used to compare solutions with it.
+        arena = self.arena
+        node = arena.new()
+        arena.depth[node] = self.instance.number_of_locations() - 1
+        arena.j[node] = 0
+        arena.length[node] = value
+        arena.guide[node] = value
+        return node
+
+    # Dominances.
+
+    def comparable(self, node):
+        return True
+
+    class Bucket:
+
+        def __init__(self, node):
+            self.node = node
+            arena = node.arena
+            self.key = (arena.j[node], arena.visited[node])
+
+        def __hash__(self):
+            return hash(self.key)
+
+        def __eq__(self, other):
+            return self.key == other.key
+
+    def dominates(self, node_1, node_2):
+        return self.arena.length[node_1] <= self.arena.length[node_2]
+
+    def dominance_key(self, node):
+        return self.arena.length[node]
+
+    # Outputs.
+
+    def display(self, node):
+        # Check if node is feasible.
+        if not self.leaf(node):
+            return ""
+        return str(self.objective_value(node))
+
+    def to_solution(self, node):
+        arena = self.arena
+        return [arena.j[index] for index in arena.path(node)[1:]]
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description='')
+    parser.add_argument(
+            "-a", "--algorithm",
+            type=str,
+            default="iterative_beam_search",
+            help='')
+    parser.add_argument(
+            "-i", "--instance",
+            type=str,
+            help='')
+    parser.add_argument(
+            "-c", "--certificate",
+            type=str,
+            default=None,
+            help='')
+
+    args = parser.parse_args()
+
+    instance = Instance(args.instance)
+    branching_scheme = BranchingScheme(instance)
+    if args.algorithm == "greedy":
+        output = treesearchsolverpy.greedy(
+                branching_scheme)
+    elif args.algorithm == "best_first_search":
+        output = treesearchsolverpy.best_first_search(
+                branching_scheme,
+                time_limit=30)
+    elif args.algorithm == "iterative_beam_search":
+        output = treesearchsolverpy.iterative_beam_search(
+                branching_scheme,
+                time_limit=30)
+    elif args.algorithm == "iterative_memory_bounded_best_first_search":
+        output = treesearchsolverpy\
+                .iterative_memory_bounded_best_first_search(
+                        branching_scheme,
+                        time_limit=30)
+    elif args.algorithm == "anytime_column_search":
+        output = treesearchsolverpy.anytime_column_search(
+                branching_scheme,
+                time_limit=30)
+    elif args.algorithm == "grasp":
+        output = treesearchsolverpy.grasp(
+                branching_scheme,
+                time_limit=30)
+    solution = branching_scheme.to_solution(output["solution_pool"].best)
+    if args.certificate is not None:
+        data = {"locations": solution}
+        with open(args.certificate, 'w') as json_file:
+            json.dump(data, json_file)
+        print()
+        instance.check(args.certificate)
@@ -0,0 +1,35 @@
+import random
+
+import pytest
+
+from examples.travellingsalesman import Instance, BranchingScheme
+
+
+def create_instance(number_of_locations, seed=0):
+    random.seed(seed)
+    instance = Instance()
+    for _ in range(number_of_locations):
+        instance.add_location(
+                random.randint(0, 1000),
+                random.randint(0, 1000))
+    return instance
+
+
+@pytest.fixture
+def instance_path(tmp_path):
+    """Return a function writing a random instance and returning its
+    path."""
+    def write(number_of_locations, seed=0):
+        path = str(tmp_path / f"instance_{number_of_locations}_{seed}.json")
+        create_instance(number_of_locations, seed).write(path)
+        return path
+    return write
+
+
+@pytest.fixture
+def branching_scheme():
+    """Return a function building the branching scheme of a random
+    instance."""
+    def build(number_of_locations, seed=0):
+        return BranchingScheme(create_instance(number_of_locations, seed))
+    return build
@@ -0,0 +1,30 @@
+import treesearchsolverpy
+
+
+def test_optimal(branching_scheme):
+    bs = branching_scheme(9)
+    output = treesearchsolverpy.anytime_column_search(bs, verbose=False)
+    reference = treesearchsolverpy.best_first_search(
+            branching_scheme(9), verbose=False)
+    assert bs.display(output["solution_pool"].best) \
+        == bs.display(reference["solution_pool"].best)
+
+
+def test_first_solution(branching_scheme):
+    # The first sweep dives to a leaf, expanding one node per depth.
+    bs = branching_scheme(12)
+    for event in treesearchsolverpy.iterate(
+            "anytime_column_search", bs, verbose=False):
+        if event["type"] == "solution":
+            break
+    assert event["type"] == "solution"
+    assert event["number_of_nodes"] <= 12
+
+
+def test_maximum_column_size(branching_scheme):
+    output = treesearchsolverpy.anytime_column_search(
+            branching_scheme(9),
+            growth_factor=2,
+            maximum_column_size=5,
+            verbose=False)
+    assert output["column_size"] == 5
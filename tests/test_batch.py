@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from treesearchsolverpy import batch
+from treesearchsolverpy.__main__ import main
+
+
+FACTORY = "examples.travellingsalesman:create_branching_scheme"
+
+
+@pytest.mark.parametrize("number_of_processes", [1, 2])
+def test_batch(instance_path, tmp_path, number_of_processes):
+    paths = [instance_path(n) for n in [5, 6, 7]]
+    output_path = str(tmp_path / "results.jsonl")
+    results = batch(
+            FACTORY,
+            str(tmp_path / "*.json"),
+            algorithm="best_first_search",
+            output_path=output_path,
+            number_of_processes=number_of_processes)
+    assert sorted(result["instance"] for result in results) == paths
+    with open(output_path) as file:
+        lines = [json.loads(line) for line in file]
+    assert len(lines) == 3
+    for result in lines:
+        assert "error" not in result
+        assert result["algorithm"] == "best_first_search"
+        assert int(result["value"]) > 0
+
+
+def test_batch_error(tmp_path):
+    path = tmp_path / "invalid.json"
+    path.write_text("{}")
+    results = batch(FACTORY, str(path))
+    assert len(results) == 1
+    assert "KeyError" in results[0]["error"]
+
+
+def test_batch_unknown_algorithm(instance_path):
+    with pytest.raises(ValueError):
+        batch(FACTORY, instance_path(5), algorithm="unknown")
+
+
+def test_main(instance_path, tmp_path, capsys):
+    path = instance_path(6)
+    main([
+        "-f", FACTORY,
+        "-i", path,
+        "-a", "greedy",
+        "-p", '{"maximum_pool_size": 2}',
+        "-j", "1"])
+    result = json.loads(capsys.readouterr().out)
+    assert result["instance"] == path
+    assert sorted(result["solution"]) == list(range(1, 6))
+
+
+@pytest.mark.parametrize("algorithm", ["iterative_beam_search", "grasp"])
+def test_batch_workers(instance_path, tmp_path, algorithm):
+    # The algorithms can start their own worker processes in the worker
+    # processes of the batch.
+    for n in [6, 7]:
+        instance_path(n)
+    results = batch(
+            FACTORY,
+            str(tmp_path / "*.json"),
+            algorithm=algorithm,
+            number_of_processes=2,
+            number_of_workers=2,
+            maximum_number_of_nodes=200)
+    assert len(results) == 2
+    for result in results:
+        assert "error" not in result
+        assert int(result["value"]) > 0
@@ -0,0 +1,26 @@
+import importlib
+
+import treesearchsolverpy
+
+
+def test_queue_pruning_deferred(branching_scheme, monkeypatch):
+    # Each improvement of the worst solution is followed by a sweep, even
+    # if the sweep is not due when the improvement is found.
+    module = importlib.import_module("treesearchsolverpy.best_first_search")
+    events = []
+    prune_queue = module.prune_queue
+
+    def logged_prune_queue(*args):
+        events.append("sweep")
+        return prune_queue(*args)
+
+    monkeypatch.setattr(module, "prune_queue", logged_prune_queue)
+    for event in treesearchsolverpy.iterate(
+            "best_first_search",
+            branching_scheme(13),
+            queue_pruning_threshold=1,
+            verbose=False):
+        if event["type"] == "solution":
+            events.append("solution")
+    assert events.count("solution") >= 2
+    assert events == ["solution", "sweep"] * events.count("solution")
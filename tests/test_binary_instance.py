@@ -0,0 +1,80 @@
+import pickle
+
+import pytest
+
+import treesearchsolverpy
+from examples.travellingsalesman import Instance, \
+                                        BranchingScheme, \
+                                        ComputedDistanceMatrix
+
+
+@pytest.mark.parametrize("distance_matrix", [False, True])
+def test_binary_instance(instance_path, tmp_path, distance_matrix):
+    instance = Instance(instance_path(15))
+    path = str(tmp_path / "instance.tspb")
+    # As the converter, read the JSON instance without its distance matrix.
+    Instance(instance_path(15), distance_matrix=False).write_binary(
+            path, distance_matrix)
+    binary_instance = Instance(path)
+    n = instance.number_of_locations()
+    assert binary_instance.number_of_locations() == n
+    for j1 in range(n):
+        assert list(binary_instance.distances[j1]) \
+            == list(instance.distances[j1])
+        for j2 in range(n):
+            assert binary_instance.distance(j1, j2) \
+                == instance.distance(j1, j2)
+
+    values = []
+    for inst in [instance, binary_instance]:
+        bs = BranchingScheme(inst)
+        output = treesearchsolverpy.iterative_beam_search(
+                bs, maximum_size_of_the_queue=64, verbose=False)
+        values.append(bs.display(output["solution_pool"].best))
+    assert values[0] == values[1]
+
+
+def test_binary_instance_pickle(instance_path, tmp_path):
+    path = str(tmp_path / "instance.tspb")
+    Instance(instance_path(10)).write_binary(path)
+    instance = Instance(path)
+    # A binary instance is sent as its path.
+    data = pickle.dumps(instance)
+    assert len(data) < 200
+    received = pickle.loads(data)
+    assert received.distance(2, 7) == instance.distance(2, 7)
+
+
+def test_invalid_binary_instance(instance_path, tmp_path):
+    path = str(tmp_path / "instance.tspb")
+    Instance(instance_path(10)).write_binary(path)
+    with open(path, "rb") as file:
+        data = file.read()
+    with open(path, "wb") as file:
+        file.write(data[:-4])
+    with pytest.raises(ValueError):
+        Instance(path)
+
+
+def test_computed_distances(instance_path):
+    instance = Instance(instance_path(15))
+    computed_instance = Instance(instance_path(15), distance_matrix=False)
+    assert isinstance(computed_instance.distances, ComputedDistanceMatrix)
+    n = instance.number_of_locations()
+    for j1 in range(n):
+        assert list(computed_instance.distances[j1]) \
+            == list(instance.distances[j1])
+        for j2 in range(n):
+            assert computed_instance.distance(j1, j2) \
+                == instance.distance(j1, j2)
+    received = pickle.loads(pickle.dumps(computed_instance))
+    assert received.distance(2, 7) == instance.distance(2, 7)
+
+
+def test_computed_distance_matrix_cache():
+    # The cache is sized in bytes: 8 n bytes per row.
+    xs = list(range(1000))
+    matrix = ComputedDistanceMatrix(xs, xs, cache_size=80000)
+    for location_id in range(1000):
+        matrix[location_id]
+    assert matrix.row.cache_info().currsize == 10
@@ -0,0 +1,29 @@
+from treesearchsolverpy.commons import BoundedBeam
+
+
+def test_key_computed_once():
+    calls = []
+
+    def key(node):
+        calls.append(node)
+        return node
+
+    beam = BoundedBeam(4, key=key)
+    nodes = [5, 3, 8, 1, 9, 2, 7, 6, 0, 4]
+    for node in nodes:
+        node_key = key(node)
+        if beam.accepts(node, node_key):
+            beam.add(node, node_key)
+    assert len(calls) == len(nodes)
+    assert beam.select() == [0, 1, 2, 3]
+    assert beam.rejects(4)
+    assert not beam.rejects(2)
+
+
+def test_without_key():
+    beam = BoundedBeam(2)
+    for node in [3, 1, 2, 0]:
+        if beam.accepts(node):
+            beam.add(node)
+    assert beam.select() == [0, 1]
+    assert beam.rejects(2)
@@ -0,0 +1,77 @@
+import pytest
+
+import treesearchsolverpy
+
+
+# Pairs (algorithm, node limit of the interrupted run).
+INTERRUPTIONS = [
+        ("greedy", 3),
+        ("greedy", 6),
+        ] + [
+        (algorithm, maximum_number_of_nodes)
+        for algorithm in [
+            "best_first_search",
+            "iterative_beam_search",
+            "iterative_memory_bounded_best_first_search",
+            "anytime_column_search"]
+        for maximum_number_of_nodes in [5, 500, 3000]]
+
+
+def resume(
+        algorithm,
+        build,
+        path,
+        maximum_number_of_nodes,
+        **parameters):
+    """Run an algorithm interrupted by a node limit, then resume it from
+    its checkpoint and return the output of the resumed run."""
+    interrupted = algorithm(
+            build(),
+            checkpoint_path=path,
+            maximum_number_of_nodes=maximum_number_of_nodes,
+            verbose=False,
+            **parameters)
+    assert interrupted["number_of_nodes"] > maximum_number_of_nodes
+    return algorithm(
+            build(),
+            resume_from=path,
+            verbose=False,
+            **parameters)
+
+
+def check_resume(
+        algorithm_name,
+        build,
+        path,
+        maximum_number_of_nodes,
+        tolerance=0,
+        **parameters):
+    """Check that a resumed run gives the same result as an uninterrupted
+    run, and the same number of nodes up to a relative 'tolerance'."""
+    algorithm = getattr(treesearchsolverpy, algorithm_name)
+    expected = algorithm(build(), verbose=False, **parameters)
+    resumed = resume(
+            algorithm,
+            build,
+            path,
+            maximum_number_of_nodes,
+            **parameters)
+    branching_scheme = build()
+    assert abs(resumed["number_of_nodes"] - expected["number_of_nodes"]) \
+        <= tolerance * expected["number_of_nodes"]
+    assert branching_scheme.display(resumed["solution_pool"].best) \
+        == branching_scheme.display(expected["solution_pool"].best)
+
+
+@pytest.mark.parametrize(
+        "algorithm_name, maximum_number_of_nodes", INTERRUPTIONS)
+def test_resume(
+        branching_scheme,
+        tmp_path,
+        algorithm_name,
+        maximum_number_of_nodes):
+    check_resume(
+            algorithm_name,
+            lambda: branching_scheme(11),
+            str(tmp_path / "checkpoint"),
+            maximum_number_of_nodes)
@@ -0,0 +1,50 @@
+import treesearchsolverpy
+
+
+def test_randomized_descents(branching_scheme):
+    # With few children per node, the default alpha selects a single
+    # child; the descents must still differ.
+    solutions = set()
+    for seed in range(10):
+        bs = branching_scheme(8)
+        output = treesearchsolverpy.greedy(
+                bs, alpha=0.1, seed=seed, verbose=False)
+        solutions.add(tuple(bs.to_solution(output["solution_pool"].best)))
+    assert len(solutions) > 1
+
+
+def test_deterministic_descent(branching_scheme):
+    solutions = set()
+    for seed in range(3):
+        bs = branching_scheme(8)
+        output = treesearchsolverpy.greedy(bs, seed=seed, verbose=False)
+        solutions.add(tuple(bs.to_solution(output["solution_pool"].best)))
+    assert len(solutions) == 1
+
+
+def test_grasp_workers(branching_scheme):
+    # The descents only depend on their seeds, so the parallel GRASP finds
+    # the same best solution as the sequential one.
+    values = []
+    for number_of_workers in [1, 2]:
+        bs = branching_scheme(9)
+        output = treesearchsolverpy.grasp(
+                bs,
+                number_of_descents=30,
+                number_of_workers=number_of_workers,
+                verbose=False)
+        assert output["number_of_descents"] == 30
+        values.append(bs.display(output["solution_pool"].best))
+    assert values[0] == values[1]
+
+
+def test_grasp_default_number_of_descents(branching_scheme):
+    # Without limits, the number of descents is bounded by default.
+    output = treesearchsolverpy.grasp(branching_scheme(6), verbose=False)
+    assert output["number_of_descents"] == 100
+    # With a node limit, descents are run until it is reached.
+    output = treesearchsolverpy.grasp(
+            branching_scheme(6),
+            maximum_number_of_nodes=1000,
+            verbose=False)
+    assert output["number_of_descents"] > 100
@@ -0,0 +1,130 @@
+import gc
+import pickle
+import functools
+
+import pytest
+
+import treesearchsolverpy
+from treesearchsolverpy.arena import LineageStore
+from examples.travellingsalesman import BranchingScheme
+
+from conftest import create_instance
+from test_checkpoint import check_resume
+
+
+class PickledBranchingScheme(BranchingScheme):
+    """Branching scheme whose nodes are pickled in the checkpoints."""
+
+    serialize_node = None
+    deserialize_node = None
+
+
+def test_lineage_store():
+    lineages = LineageStore()
+    a = lineages.extend(None, 1)
+    b = lineages.extend(a, 2)
+    c = lineages.extend(b, 3)
+    assert lineages.moves(c) == [1, 2, 3]
+    assert lineages.moves(None) == []
+    del a, b
+    assert len(lineages) == 3
+    # The records of a lineage are freed with its last handle, and reused.
+    del c
+    gc.collect()
+    assert len(lineages) == 0
+    d = lineages.extend(None, 4)
+    assert lineages.moves(d) == [4]
+    assert len(lineages.references) == 3
+
+
+def test_lineage_pickle():
+    lineages = LineageStore()
+    lineage = lineages.from_moves([1, 2, 3])
+    received = pickle.loads(pickle.dumps(lineage))
+    # A received lineage is accepted by any store.
+    other = LineageStore()
+    assert other.moves(received) == [1, 2, 3]
+    child = other.extend(received, 4)
+    assert other.moves(child) == [1, 2, 3, 4]
+    assert lineages.moves(lineages.extend(received, 5)) == [1, 2, 3, 5]
+
+
+def test_from_moves_shares_prefixes():
+    lineages = LineageStore()
+    a = lineages.from_moves([1, 2, 3])
+    b = lineages.from_moves([1, 2, 4])
+    c = lineages.from_moves([1, 2, 3])
+    assert len(lineages) == 4
+    assert int(a) == int(c)
+    assert lineages.moves(b) == [1, 2, 4]
+    del a, b, c
+    gc.collect()
+    assert len(lineages) == 0
+    assert not lineages.rebuilt
+    assert lineages.moves(lineages.from_moves([1, 5])) == [1, 5]
+
+
+def test_received_nodes_share_records():
+    bs = BranchingScheme(create_instance(12))
+    output = treesearchsolverpy.iterative_beam_search(
+            bs, maximum_size_of_the_queue=256, verbose=False)
+    solution = bs.to_solution(output["solution_pool"].best)
+    # Nodes of the same tree, sent to another branching scheme.
+    nodes = [bs.root()]
+    for _ in range(6):
+        nodes = [
+                child
+                for node in nodes[:40]
+                for child in bs.next_children(node)]
+    data = pickle.dumps(nodes)
+    receiver = BranchingScheme(create_instance(12))
+    received = pickle.loads(data)
+    assert [receiver.to_solution(node) for node in received] \
+        == [bs.to_solution(node) for node in nodes]
+    prefixes = {
+            tuple(bs.to_solution(node)[:length])
+            for node in nodes
+            for length in range(1, len(bs.to_solution(node)) + 1)}
+    assert len(receiver.lineages) <= len(prefixes)
+    assert receiver.to_solution(receiver.from_solution(solution)) \
+        == solution
+
+
+def test_deserialized_nodes_share_records():
+    bs = BranchingScheme(create_instance(12))
+    nodes = [bs.from_solution([1, 2, 3, j]) for j in range(4, 12)]
+    # The lineage of the common father is shared.
+    assert len(bs.lineages) == 3
+    assert bs.to_solution(nodes[0]) == [1, 2, 3, 4]
+
+
+def test_portfolio():
+    instance = create_instance(9)
+    bs = BranchingScheme(instance)
+    expected = treesearchsolverpy.best_first_search(bs, verbose=False)
+    output = treesearchsolverpy.portfolio(
+            functools.partial(BranchingScheme, instance),
+            algorithms=[
+                "greedy",
+                "best_first_search",
+                "iterative_beam_search"],
+            verbose=False)
+    best = output["solution_pool"].best
+    assert bs.display(best) == bs.display(expected["solution_pool"].best)
+    assert sorted(bs.to_solution(best)) == list(range(1, 9))
+
+
+@pytest.mark.parametrize("algorithm_name", [
+        "best_first_search",
+        "iterative_beam_search",
+        "anytime_column_search"])
+def test_pickled_checkpoint(tmp_path, algorithm_name):
+    # Pickled nodes keep their ids while the ids of the new nodes restart
+    # from 0, so ties between nodes of the same length may be broken
+    # differently than in the uninterrupted run.
+    check_resume(
+            algorithm_name,
+            lambda: PickledBranchingScheme(create_instance(11)),
+            str(tmp_path / "checkpoint"),
+            1000,
+            tolerance=0.01)
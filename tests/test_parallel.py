@@ -0,0 +1,108 @@
+import gc
+import os
+import signal
+import warnings
+import multiprocessing
+import functools
+
+import pytest
+
+import treesearchsolverpy
+from examples.travellingsalesman import BranchingScheme
+from examples.travellingsalesman_arena import \
+        BranchingScheme as ArenaBranchingScheme
+
+from conftest import create_instance
+
+
+class KilledBranchingScheme(BranchingScheme):
+    """Branching scheme whose worker processes are killed when they expand
+    a node."""
+
+    def __init__(self, instance, main_pid=None):
+        super().__init__(instance)
+        self.main_pid = os.getpid() if main_pid is None else main_pid
+
+    def next_children(self, father):
+        if os.getpid() != self.main_pid:
+            os.kill(os.getpid(), signal.SIGKILL)
+        return super().next_children(father)
+
+
+def optimal_value(number_of_locations):
+    bs = BranchingScheme(create_instance(number_of_locations))
+    output = treesearchsolverpy.best_first_search(bs, verbose=False)
+    return bs.display(output["solution_pool"].best)
+
+
+@pytest.mark.parametrize("number_of_workers", [1, 2, 3])
+def test_parallel_best_first_search(branching_scheme, number_of_workers):
+    bs = branching_scheme(9)
+    output = treesearchsolverpy.parallel_best_first_search(
+            bs,
+            number_of_workers=number_of_workers,
+            verbose=False)
+    assert bs.display(output["solution_pool"].best) == optimal_value(9)
+    assert len(output["outputs"]) == number_of_workers
+
+
+def test_parallel_best_first_search_killed_worker():
+    bs = KilledBranchingScheme(create_instance(9))
+    with pytest.raises(RuntimeError, match="exited"):
+        treesearchsolverpy.parallel_best_first_search(
+                bs,
+                number_of_workers=2,
+                time_limit=60,
+                verbose=False)
+
+
+def test_parallel_best_first_search_arena():
+    # Handles can't be pickled; this is detected before starting workers.
+    bs = ArenaBranchingScheme(create_instance(9))
+    with pytest.raises(TypeError):
+        treesearchsolverpy.parallel_best_first_search(
+                bs,
+                number_of_workers=2,
+                verbose=False)
+
+
+def test_portfolio_killed_worker():
+    factory = functools.partial(
+            KilledBranchingScheme, create_instance(9), os.getpid())
+    with pytest.raises(RuntimeError, match="exited"):
+        treesearchsolverpy.portfolio(
+                factory,
+                algorithms=["greedy", "best_first_search"],
+                verbose=False)
+
+
+def test_iterative_beam_search_workers(branching_scheme):
+    values = []
+    for number_of_workers in [1, 2]:
+        bs = branching_scheme(9)
+        output = treesearchsolverpy.iterative_beam_search(
+                bs,
+                number_of_workers=number_of_workers,
+                verbose=False)
+        values.append(bs.display(output["solution_pool"].best))
+    assert values[0] == values[1] == optimal_value(9)
+
+
+def test_iterative_beam_search_workers_closed(branching_scheme):
+    # The worker processes are stopped when the iterator is closed before
+    # the end of the search, instead of leaking the pool.
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        iterator = treesearchsolverpy.iterate(
+                "iterative_beam_search",
+                branching_scheme(10),
+                number_of_workers=2,
+                verbose=False)
+        for event in iterator:
+            if event["type"] == "progress":
+                break
+        iterator.close()
+        del iterator
+        gc.collect()
+    assert not [w for w in caught if w.category is ResourceWarning]
+    assert not multiprocessing.active_children()
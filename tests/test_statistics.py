@@ -0,0 +1,60 @@
+import treesearchsolverpy
+from treesearchsolverpy import statistics
+
+
+def test_layer_duration(branching_scheme):
+    output = treesearchsolverpy.iterative_beam_search(
+            branching_scheme(12),
+            maximum_size_of_the_queue=64,
+            statistics=True,
+            verbose=False)
+    layers = output["statistics"]["layers"]
+    assert layers
+    previous_time = 0
+    for layer in layers:
+        assert 0 <= layer["duration"] <= layer["time"] - previous_time
+        previous_time = layer["time"]
+    assert sum(layer["duration"] for layer in layers) \
+        <= output["elapsed_time"]
+
+
+def test_grasp_statistics(branching_scheme):
+    received = []
+    output = treesearchsolverpy.grasp(
+            branching_scheme(10),
+            number_of_descents=5,
+            statistics=received.append,
+            verbose=False)
+    assert received == [output["statistics"]]
+    callbacks = output["statistics"]["callbacks"]
+    assert callbacks["root"]["number_of_calls"] >= 5
+    assert callbacks["leaf"]["number_of_calls"] > 0
+
+
+def test_queue_statistics(branching_scheme):
+    for algorithm in [
+            treesearchsolverpy.best_first_search,
+            treesearchsolverpy.iterative_beam_search]:
+        output = algorithm(
+                branching_scheme(10),
+                maximum_number_of_nodes=500,
+                statistics=True,
+                verbose=False)
+        queue = output["statistics"]["queue"]
+        assert queue["add"]["number_of_calls"] > 0
+        assert queue["add"]["time"] > 0
+
+
+def test_generator_timed():
+    calls = []
+
+    def next_children(node):
+        for child in range(3):
+            calls.append(child)
+            yield child
+
+    entry = [0, 0.0]
+    children = statistics.timed(entry, next_children)(None)
+    assert calls == [0, 1, 2]
+    assert list(children) == [0, 1, 2]
+    assert entry[0] == 1
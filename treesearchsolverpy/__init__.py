@@ -1,9 +1,25 @@
 from .greedy import greedy
 from .best_first_search import best_first_search
+from .parallel_best_first_search import parallel_best_first_search
 from .iterative_beam_search import iterative_beam_search
+from .iterative_memory_bounded_best_first_search import \
+        iterative_memory_bounded_best_first_search
+from .anytime_column_search import anytime_column_search
+from .grasp import grasp
+from .portfolio import portfolio
+from .iterators import iterate, aiterate
+from .batch import batch
 
 __all__ = [
     'greedy',
     'best_first_search',
+    'parallel_best_first_search',
     'iterative_beam_search',
+    'iterative_memory_bounded_best_first_search',
+    'anytime_column_search',
+    'grasp',
+    'portfolio',
+    'iterate',
+    'aiterate',
+    'batch',
 ]
@@ -0,0 +1,80 @@
+"""Solve a set of instances and write the results as JSON lines.
+
+Usage::
+
+    python3 -m treesearchsolverpy \\
+            -f examples.travellingsalesman:create_branching_scheme \\
+            -i "data/*.json" \\
+            -a iterative_beam_search \\
+            -t 10 \\
+            -j 8 \\
+            -o results.jsonl
+
+"""
+
+from .batch import batch
+
+import os
+import json
+import argparse
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+            prog="python3 -m treesearchsolverpy",
+            description='Solve a set of instances with a tree search '
+                        'algorithm.')
+    parser.add_argument(
+            "-f", "--factory",
+            type=str,
+            required=True,
+            help='branching scheme factory, as module:callable; it is '
+                 'called with the path of an instance')
+    parser.add_argument(
+            "-i", "--instances",
+            type=str,
+            nargs="+",
+            required=True,
+            help='glob patterns of the instances')
+    parser.add_argument(
+            "-a", "--algorithm",
+            type=str,
+            default="iterative_beam_search",
+            help='algorithm')
+    parser.add_argument(
+            "-t", "--time-limit",
+            type=float,
+            default=None,
+            help='time limit of each instance, in seconds')
+    parser.add_argument(
+            "-p", "--parameters",
+            type=str,
+            default="{}",
+            help='other parameters of the algorithm, as a JSON object')
+    parser.add_argument(
+            "-j", "--number-of-processes",
+            type=int,
+            default=os.cpu_count(),
+            help='number of worker processes')
+    parser.add_argument(
+            "-o", "--output",
+            type=str,
+            default="-",
+            help='path of the JSON lines output file')
+
+    args = parser.parse_args(argv)
+
+    parameters = json.loads(args.parameters)
+    if args.time_limit is not None:
+        parameters["time_limit"] = args.time_limit
+    batch(
+            args.factory,
+            args.instances,
+            algorithm=args.algorithm,
+            output_path=args.output,
+            number_of_processes=args.number_of_processes,
+            **parameters)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+from .commons import SolutionPool, \
+                     Termination, \
+                     History, \
+                     warm_start, \
+                     search_event, \
+                     run, \
+                     get_next_children, \
+                     get_less, \
+                     new_sorted_list, \
+                     add_to_history_and_queue, \
+                     remove_from_history_and_queue
+from .statistics import setup_statistics
+from .checkpoint import setup_checkpoint
+
+import math
+import time
+
+
+def anytime_column_search(branching_scheme, **parameters):
+    return run(anytime_column_search_iterator(branching_scheme, **parameters))
+
+
+def anytime_column_search_iterator(branching_scheme, **parameters):
+    """Iterator version of 'anytime_column_search'.
+
+    Yield the events of the search (see 'search_event') and return its
+    output.
+
+    """
+    # Read parameters.
+    start = time.monotonic()
+    maximum_pool_size = parameters.get(
+            "maximum_pool_size", 1)
+    initial_column_size = parameters.get(
+            "initial_column_size", 1)
+    maximum_column_size = parameters.get(
+            "maximum_column_size", float('inf'))
+    growth_factor = parameters.get(
+            "growth_factor", 1.5)
+    maximum_number_of_nodes = parameters.get(
+            "maximum_number_of_nodes", float('inf'))
+    time_limit = parameters.get(
+            "time_limit", float('inf'))
+    verbose = parameters.get(
+            "verbose", True)
+
+    if verbose:
+        print("======================================")
+        print("           TreeSearchSolver           ")
+        print("======================================")
+        print()
+        print("Algorithm")
+        print("---------")
+        print("Anytime column search")
+        print()
+        print("Parameters")
+        print("----------")
+        print(f"Initial column size:        {initial_column_size}")
+        print(f"Maximum column size:        {maximum_column_size}")
+        print(f"Growth factor:              {growth_factor}")
+        print(f"Maximum number of nodes:    {maximum_number_of_nodes}")
+        print(f"Maximum pool size:          {maximum_pool_size}")
+        print(f"Time limit:                 {time_limit}")
+
+    # Setup structures.
+    branching_scheme, statistics = setup_statistics(
+            branching_scheme, parameters)
+    solution_pool = parameters.get("solution_pool", None)
+    if solution_pool is None:
+        solution_pool = SolutionPool(branching_scheme, maximum_pool_size)
+    warm_start(branching_scheme, solution_pool, parameters)
+    next_children = get_next_children(branching_scheme)
+    less = get_less(branching_scheme)
+    termination = Termination(
+            branching_scheme, solution_pool, start, parameters)
+    termination.statistics = statistics
+    # One queue and one dominance history per depth.
+    queues = []
+    histories = []
+
+    def new_depth():
+        queue = new_sorted_list(branching_scheme)
+        queues.append(queue)
+        if statistics is None:
+            histories.append(History(branching_scheme))
+        else:
+            histories.append(statistics.history(branching_scheme))
+            statistics.queue(queue)
+
+    checkpoint, state = setup_checkpoint(
+            branching_scheme, "anytime_column_search", parameters)
+    number_of_nodes = 0
+    maximum_size_of_the_queue = 1
+    column_size = initial_column_size
+    # Position of the sweep: depth of the current column, node being
+    # expanded and number of nodes of the column already expanded.
+    depth = 0
+    current_node = None
+    number_of_expanded_nodes = 0
+
+    def save_checkpoint():
+        nodes = []
+        depths = []
+        for d, queue in enumerate(queues):
+            nodes.extend(queue)
+            depths += [d] * len(queue)
+        checkpoint.save(
+                {
+                    "algorithm": "anytime_column_search",
+                    "column_size": column_size,
+                    "number_of_nodes": number_of_nodes,
+                    "maximum_size_of_the_queue": maximum_size_of_the_queue,
+                    "depths": depths,
+                    "depth": depth,
+                    "number_of_expanded_nodes": number_of_expanded_nodes},
+                {
+                    "solutions": list(solution_pool.solutions),
+                    "queue": nodes,
+                    "current_node": (
+                        [] if current_node is None else [current_node])})
+
+    # Initial display.
+    solution_pool.display_init(verbose)
+
+    if state is None:
+        # Initialize the queue of depth 0 with root node.
+        new_depth()
+        root = branching_scheme.root()
+        add_to_history_and_queue(
+                branching_scheme, histories[0], queues[0], root)
+    else:
+        # Restore the state of the search from the checkpoint.
+        data, nodes = state
+        column_size = data["column_size"]
+        number_of_nodes = data["number_of_nodes"]
+        maximum_size_of_the_queue = data["maximum_size_of_the_queue"]
+        for solution in nodes["solutions"]:
+            if branching_scheme.better(solution, solution_pool.worst):
+                solution_pool.add(solution)
+        new_depth()
+        for d, node in zip(data["depths"], nodes["queue"]):
+            while d >= len(queues):
+                new_depth()
+            add_to_history_and_queue(
+                    branching_scheme, histories[d], queues[d], node)
+        # The sweep restarts from the column of the checkpoint.
+        depth = data["depth"]
+        while depth >= len(queues):
+            new_depth()
+        number_of_expanded_nodes = data["number_of_expanded_nodes"]
+        if nodes["current_node"]:
+            current_node = nodes["current_node"][0]
+        solution_pool.display("resumed", start, verbose)
+    # Becomes True if the search must be terminated.
+    end = False
+
+    while not end:
+        # Display.
+        message = f"c {column_size}"
+        solution_pool.display(message, start, verbose)
+        # Sweep the depths, expanding a column of nodes at each depth.
+        if state is None:
+            depth = 0
+        state = None
+        while depth < len(queues):
+            queue = queues[depth]
+            history = histories[depth]
+            if not queue and current_node is None:
+                depth += 1
+                number_of_expanded_nodes = 0
+                continue
+            if depth + 1 == len(queues):
+                new_depth()
+            queue_next = queues[depth + 1]
+            history_next = histories[depth + 1]
+            while current_node is not None or queue:
+
+                # Check termination.
+                if number_of_nodes >= termination.next_check:
+                    if termination.stop(
+                            number_of_nodes,
+                            sum(len(q) for q in queues)):
+                        end = True
+                        break
+                    # Save checkpoint.
+                    if checkpoint is not None and checkpoint.due():
+                        save_checkpoint()
+                    yield search_event(
+                            "progress",
+                            solution_pool,
+                            start,
+                            number_of_nodes,
+                            queue_size=sum(len(q) for q in queues))
+
+                # Get the next processed node from the queue.
+                if current_node is None:
+                    if number_of_expanded_nodes >= column_size:
+                        break
+                    current_node = queue[0]
+                    remove_from_history_and_queue(
+                            branching_scheme, history, queue, 0)
+                    # Check bound.
+                    if branching_scheme.bound(
+                            current_node, solution_pool.worst):
+                        current_node = None
+                        continue
+                    number_of_expanded_nodes += 1
+
+                number_of_nodes += 1
+
+                # Get next children.
+                for child in next_children(current_node):
+                    # Update best solution.
+                    if branching_scheme.better(child, solution_pool.worst):
+                        display = branching_scheme.better(
+                                child, solution_pool.best)
+                        solution_pool.add(child)
+                        # Display.
+                        if display:
+                            message = f"node {number_of_nodes}"
+                            solution_pool.display(message, start, verbose)
+                            yield search_event(
+                                    "solution",
+                                    solution_pool,
+                                    start,
+                                    number_of_nodes)
+                    # Add child to the queue of the next depth.
+                    if (
+                            not branching_scheme.leaf(child)
+                            and not branching_scheme.bound(
+                                child, solution_pool.worst)):
+                        # Add child to the queue (and the history).
+                        add_to_history_and_queue(
+                                branching_scheme,
+                                history_next,
+                                queue_next,
+                                child)
+
+                # If current_node still has children, put it back to the
+                # queue.
+                if branching_scheme.infertile(current_node):
+                    current_node = None
+                elif len(queue) > 0 and less(queue[0], current_node):
+                    add_to_history_and_queue(
+                            branching_scheme, history, queue, current_node)
+                    current_node = None
+
+            if end:
+                break
+            depth += 1
+            number_of_expanded_nodes = 0
+
+        # Update statistics.
+        maximum_size_of_the_queue = max(
+                maximum_size_of_the_queue,
+                sum(len(queue) for queue in queues))
+
+        # Stop if the search has been interrupted or if all the queues are
+        # empty (the search is complete).
+        if end or not any(queues):
+            break
+
+        column_size = min(
+                math.ceil(growth_factor * column_size),
+                maximum_column_size)
+
+    # Save the state of an interrupted search.
+    if checkpoint is not None and termination.reason is not None:
+        save_checkpoint()
+
+    # Final display.
+    solution_pool.display_end(start, verbose)
+    if verbose:
+        print(f"Number of nodes:             {number_of_nodes}")
+        print(f"Column size:                 {column_size}")
+
+    end = time.monotonic()
+
+    output = {
+            "solution_pool": solution_pool,
+            "maximum_size_of_the_queue": maximum_size_of_the_queue,
+            "column_size": column_size,
+            "number_of_nodes": number_of_nodes,
+            "elapsed_time": end - start}
+    if statistics is not None:
+        statistics.report(output)
+    yield {"type": "end", **output}
+    return output
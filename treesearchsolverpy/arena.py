@@ -0,0 +1,275 @@
+import array
+
+
+class Handle(int):
+    """Integer handle of a node stored in a NodeArena.
+
+    Handles compare by guide, then by index, so that they can be used as
+    nodes by the algorithms. Each arena creates its own subclass bound to it.
+    When a handle is garbage collected, the reference it holds on its node is
+    released.
+
+    """
+
+    __slots__ = ()
+    arena = None
+
+    def __lt__(self, other):
+        guide = self.arena.guide
+        guide_1 = guide[self]
+        guide_2 = guide[other]
+        if guide_1 != guide_2:
+            return guide_1 < guide_2
+        return int.__lt__(self, other)
+
+    def __gt__(self, other):
+        return other.__lt__(self)
+
+    def __le__(self, other):
+        return not other.__lt__(self)
+
+    def __ge__(self, other):
+        return not self.__lt__(other)
+
+    def __del__(self):
+        self.arena.release(self)
+
+    def __reduce__(self):
+        raise TypeError("Node handles can't be sent to another process.")
+
+
+class LineageHandle(Handle):
+    """Handle of a record of a LineageStore.
+
+    When it is sent to another process, it is converted to the tuple of its
+    moves, which the lineage store of the receiving branching scheme
+    accepts as a lineage.
+
+    """
+
+    __slots__ = ()
+
+    def __reduce__(self):
+        return (tuple, (tuple(self.arena.moves(self)), ))
+
+
+class NodeArena:
+    """Struct-of-arrays storage of the nodes of a branching scheme.
+
+    A node is a row of the arena, identified by an integer handle. The arena
+    always stores the columns 'guide' (float), 'depth' and 'parent' (index of
+    the parent row, -1 for a root). Other columns are given as keyword
+    arguments mapping their name to an 'array' type code; the type code 'O'
+    stores arbitrary Python objects in a list. Columns are attributes of the
+    arena::
+
+        arena = NodeArena(length='q', visited='O')
+        node = arena.new(parent)
+        arena.length[node] = arena.length[parent] + d
+
+    Rows are reference counted: a row is referenced by each of its handles
+    and by each of its children. When it is not referenced anymore, it is
+    added to a free list and reused by the next allocated node.
+
+    """
+
+    # Base class of the handles of the arena.
+    handle_class = Handle
+
+    def __init__(self, **columns):
+        self.columns = {
+                "guide": 'd',
+                "depth": 'q',
+                "parent": 'q',
+                **columns}
+        for name, typecode in self.columns.items():
+            if typecode == 'O':
+                setattr(self, name, [])
+            else:
+                setattr(self, name, array.array(typecode))
+        self.references = array.array('q')
+        self.free = []
+        self.Handle = type(
+                "Handle",
+                (self.handle_class, ),
+                {"__slots__": (), "arena": self})
+
+    def __len__(self):
+        """Return the number of nodes in use."""
+        return len(self.references) - len(self.free)
+
+    def new(self, parent=None):
+        """Allocate a node and return its handle."""
+        if self.free:
+            index = self.free.pop()
+        else:
+            index = len(self.references)
+            self.references.append(0)
+            for name, typecode in self.columns.items():
+                getattr(self, name).append(None if typecode == 'O' else 0)
+        if parent is None:
+            self.parent[index] = -1
+            self.depth[index] = 0
+        else:
+            self.parent[index] = parent
+            self.depth[index] = self.depth[parent] + 1
+            self.references[parent] += 1
+        self.guide[index] = 0
+        return self.handle(index)
+
+    def handle(self, index):
+        """Return a new handle on an existing node."""
+        self.references[index] += 1
+        return self.Handle(index)
+
+    def get_parent(self, node):
+        """Return a handle on the parent of a node, None for a root."""
+        parent = self.parent[node]
+        if parent < 0:
+            return None
+        return self.handle(parent)
+
+    def path(self, node):
+        """Return the indices of the nodes from the root to 'node'."""
+        indices = []
+        index = int(node)
+        while index >= 0:
+            indices.append(index)
+            index = self.parent[index]
+        indices.reverse()
+        return indices
+
+    def release(self, index):
+        references = self.references
+        parent = self.parent
+        index = int(index)
+        while index >= 0:
+            references[index] -= 1
+            if references[index] > 0:
+                return
+            # Free the objects referenced by the node.
+            for name, typecode in self.columns.items():
+                if typecode == 'O':
+                    getattr(self, name)[index] = None
+            self.free.append(index)
+            index = parent[index]
+
+
+class LineageStore(NodeArena):
+    """Store of the lineages of the nodes of a branching scheme.
+
+    Instead of a reference to its parent node, a node holds a lineage, a
+    handle on a record (parent record, move) of the store. A solution is
+    rebuilt from the moves of the records from the root to its lineage, and
+    a node doesn't keep its ancestors alive, only their records. Records are
+    reference counted by their handles and their children, and the records
+    of freed lineages are reused::
+
+        lineages = LineageStore()
+        child.lineage = lineages.extend(father.lineage, move)
+        moves = lineages.moves(node.lineage)
+
+    To avoid allocating a record for each child generated, a child may
+    store the lineage of its father and its move, and build its own lineage
+    only when it is expanded.
+
+    A lineage sent to another process, for example in a checkpoint or
+    between the workers of a parallel algorithm, becomes the tuple of its
+    moves. The methods of the store accept such tuples as lineages and
+    rebuild their records on first use. The records rebuilt from moves are
+    shared by the lineages with a common prefix. A lineage store is sent to
+    another process empty.
+
+    """
+
+    handle_class = LineageHandle
+
+    def __init__(self):
+        super().__init__(move='q')
+        # Records built by 'from_moves': (parent index, move) -> index, and
+        # index -> (parent index, move).
+        self.rebuilt = {}
+        self.rebuilt_keys = {}
+
+    def __reduce__(self):
+        return (LineageStore, ())
+
+    def extend(self, parent, move):
+        """Return a new lineage, child of 'parent' (None for the root) by
+        'move'."""
+        if type(parent) is tuple:
+            parent = self.from_moves(parent)
+        # Same as 'new', without the loop on the columns since this is called
+        # for each child.
+        references = self.references
+        if parent is None:
+            parent = -1
+            depth = 0
+        else:
+            references[parent] += 1
+            depth = self.depth[parent] + 1
+        if self.free:
+            index = self.free.pop()
+            self.parent[index] = parent
+            self.depth[index] = depth
+            self.move[index] = move
+            references[index] = 1
+        else:
+            index = len(references)
+            self.guide.append(0)
+            self.parent.append(parent)
+            self.depth.append(depth)
+            self.move.append(move)
+            references.append(1)
+        return self.Handle(index)
+
+    def release(self, index):
+        # The store has no object column.
+        references = self.references
+        parent = self.parent
+        free = self.free
+        rebuilt_keys = self.rebuilt_keys
+        index = int(index)
+        while index >= 0:
+            references[index] -= 1
+            if references[index] > 0:
+                return
+            if rebuilt_keys:
+                key = rebuilt_keys.pop(index, None)
+                if key is not None:
+                    del self.rebuilt[key]
+            free.append(index)
+            index = parent[index]
+
+    def moves(self, lineage):
+        """Return the moves from the root to 'lineage'."""
+        if lineage is None:
+            return []
+        if type(lineage) is tuple:
+            return list(lineage)
+        move = self.move
+        return [move[index] for index in self.path(lineage)]
+
+    def from_moves(self, moves):
+        """Return a lineage with the moves 'moves'.
+
+        The records of the lineages built by this method are shared: only
+        the moves after the longest common prefix with the lineages already
+        built get new records.
+
+        """
+        rebuilt = self.rebuilt
+        lineage = None
+        parent = -1
+        for move in moves:
+            key = (parent, move)
+            index = rebuilt.get(key)
+            if index is None:
+                lineage = self.extend(lineage, move)
+                index = int(lineage)
+                rebuilt[key] = index
+                self.rebuilt_keys[index] = key
+            else:
+                lineage = self.handle(index)
+            parent = index
+        return lineage
@@ -0,0 +1,206 @@
+from .portfolio import ALGORITHMS, \
+                       get_result
+
+import sys
+import glob
+import json
+import time
+import signal
+import importlib
+import traceback
+import multiprocessing
+
+
+def load_factory(branching_scheme_factory):
+    """Return the branching scheme factory designated by
+    'module:callable', or the factory itself if it is already callable."""
+    if callable(branching_scheme_factory):
+        return branching_scheme_factory
+    module_name, _, name = branching_scheme_factory.partition(":")
+    if not name:
+        raise ValueError(
+                f"Invalid branching scheme factory "
+                f"'{branching_scheme_factory}', expected 'module:callable'.")
+    factory = importlib.import_module(module_name)
+    for attribute in name.split("."):
+        factory = getattr(factory, attribute)
+    return factory
+
+
+def find_instances(patterns):
+    """Return the sorted paths matching a glob pattern or a list of glob
+    patterns."""
+    if isinstance(patterns, str):
+        patterns = [patterns]
+    paths = set()
+    for pattern in patterns:
+        paths.update(glob.glob(pattern, recursive=True))
+    return sorted(paths)
+
+
+# Branching scheme factory of the worker processes.
+worker_factory = None
+
+
+def worker_initializer(branching_scheme_factory):
+    global worker_factory
+    worker_factory = load_factory(branching_scheme_factory)
+
+
+def solve_instance(arguments):
+    instance_path, algorithm, parameters = arguments
+    start = time.monotonic()
+    try:
+        branching_scheme = worker_factory(instance_path)
+        output = ALGORITHMS[algorithm](
+                branching_scheme,
+                **{**parameters, "verbose": False})
+    except Exception:
+        # Report the error instead of stopping the whole batch.
+        return {
+                "instance": instance_path,
+                "algorithm": algorithm,
+                "elapsed_time": time.monotonic() - start,
+                "error": traceback.format_exc()}
+    best = output["solution_pool"].best
+    result = {
+            "instance": instance_path,
+            "algorithm": algorithm,
+            "value": branching_scheme.display(best),
+            "solution": branching_scheme.to_solution(best)}
+    for key, value in output.items():
+        if key != "solution_pool":
+            result[key] = value
+    return result
+
+
+def batch_worker(branching_scheme_factory, worker_id, tasks, results):
+    # Stop the algorithm with an exception when the worker is terminated, so
+    # that it stops its own worker processes.
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(1))
+    worker_initializer(branching_scheme_factory)
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        results.put((worker_id, solve_instance(task)))
+    # Tell the main process that the worker is done.
+    results.put((worker_id, None))
+
+
+def batch_iterator(
+        branching_scheme_factory,
+        instances,
+        algorithm="iterative_beam_search",
+        number_of_processes=1,
+        **parameters):
+    """Iterator version of 'batch'.
+
+    Yield the result of each instance as soon as it is solved, in completion
+    order.
+
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown algorithm: '{algorithm}'.")
+    instance_paths = find_instances(instances)
+    tasks = [(path, algorithm, parameters) for path in instance_paths]
+    if number_of_processes <= 1:
+        worker_initializer(branching_scheme_factory)
+        for task in tasks:
+            yield solve_instance(task)
+        return
+    # The factory is loaded once per worker, and each worker solves several
+    # instances. The workers are not daemonic, so that the algorithms can
+    # start their own worker processes ('number_of_workers').
+    number_of_processes = min(number_of_processes, len(tasks))
+    task_queue = multiprocessing.Queue()
+    for task in tasks:
+        task_queue.put(task)
+    for _ in range(number_of_processes):
+        task_queue.put(None)
+    results = multiprocessing.Queue()
+    processes = []
+    try:
+        for worker_id in range(number_of_processes):
+            process = multiprocessing.Process(
+                    target=batch_worker,
+                    args=(
+                        branching_scheme_factory,
+                        worker_id,
+                        task_queue,
+                        results))
+            process.start()
+            processes.append(process)
+        done = [False] * number_of_processes
+        number_of_results = 0
+        while not all(done):
+            worker_id, result = get_result(results, processes, done)
+            if result is None:
+                done[worker_id] = True
+                continue
+            number_of_results += 1
+            yield result
+        if number_of_results < len(tasks):
+            raise RuntimeError(
+                    f"{len(tasks) - number_of_results} results of the batch "
+                    f"have not been received.")
+        for process in processes:
+            process.join()
+    finally:
+        # The tasks left are not needed anymore, don't wait for them to be
+        # flushed before exiting.
+        task_queue.cancel_join_thread()
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+                process.join()
+
+
+def batch(
+        branching_scheme_factory,
+        instances,
+        algorithm="iterative_beam_search",
+        output_path=None,
+        number_of_processes=1,
+        **parameters):
+    """Solve a set of instances with the same algorithm.
+
+    'branching_scheme_factory' is either a string 'module:callable' or a
+    picklable callable; it is called with the path of an instance and
+    returns its branching scheme. When it is given as a string, it is
+    imported once in each worker process. 'instances' is a glob pattern or
+    a list of glob patterns. The other parameters, for example
+    'time_limit', are passed to the algorithm for each instance.
+
+    The result of each instance is a dictionary containing the path of the
+    instance, the algorithm, the value ('display') and the solution
+    ('to_solution') of the best solution found, and the other entries of
+    the output of the algorithm. If solving an instance raises an
+    exception, its result contains the traceback in 'error' instead. If
+    'output_path' is set, each result is written as a JSON line as soon as
+    the instance is solved ('-' for the standard output).
+
+    Return the list of the results.
+
+    """
+    results = []
+    output_file = None
+    if output_path == "-":
+        output_file = sys.stdout
+    elif output_path is not None:
+        output_file = open(output_path, "w")
+    try:
+        for result in batch_iterator(
+                branching_scheme_factory,
+                instances,
+                algorithm,
+                number_of_processes,
+                **parameters):
+            results.append(result)
+            if output_file is not None:
+                output_file.write(json.dumps(result, default=str) + "\n")
+                output_file.flush()
+    finally:
+        if output_file is not None and output_file is not sys.stdout:
+            output_file.close()
+    return results
@@ -1,14 +1,43 @@
 from .commons import SolutionPool, \
+                     Termination, \
+                     History, \
+                     HeapQueue, \
+                     warm_start, \
+                     search_event, \
+                     run, \
+                     get_next_children, \
+                     get_less, \
+                     new_sorted_list, \
                      add_to_history_and_queue, \
-                     remove_from_history_and_queue
+                     remove_from_history_and_queue, \
+                     prune_queue
+from .statistics import setup_statistics
+from .checkpoint import setup_checkpoint
 
 import time
-from sortedcontainers import SortedList
 
 
 def best_first_search(branching_scheme, **parameters):
+    return run(best_first_search_iterator(branching_scheme, **parameters))
+
+
+def best_first_search_iterator(branching_scheme, **parameters):
+    """Iterator version of 'best_first_search'.
+
+    Yield the events of the search (see 'search_event') and return its
+    output.
+
+    If 'queue_pruning_threshold' is set to r, the nodes bounded by the worst
+    solution of the pool are removed from the queue and the history in a
+    single sweep after the worst solution improves. The threshold doesn't
+    depend on the size of the improvement: it is the ratio between the
+    number of nodes added to the queue since the previous sweep and the size
+    of the queue. A sweep is deferred until this ratio reaches r, so that
+    its cost is amortized over the insertions.
+
+    """
     # Read parameters.
-    start = time.time()
+    start = time.monotonic()
     maximum_pool_size = parameters.get(
             "maximum_pool_size", 1)
     maximum_number_of_nodes = parameters.get(
@@ -17,6 +46,10 @@ def best_first_search(branching_scheme, **parameters):
             "time_limit", float('inf'))
     new_solution_callback = parameters.get(
             "new_solution_callback", None)
+    queue_type = parameters.get(
+            "queue_type", "sorted_list")
+    queue_pruning_threshold = parameters.get(
+            "queue_pruning_threshold", None)
     verbose = parameters.get(
             "verbose", True)
 
@@ -34,31 +67,93 @@ def best_first_search(branching_scheme, **parameters):
         print(f"Maximum number of nodes:    {maximum_number_of_nodes}")
         print(f"Maximum pool size:          {maximum_pool_size}")
         print(f"Time limit:                 {time_limit}")
+        print(f"Queue type:                 {queue_type}")
+        print(f"Queue pruning threshold:    {queue_pruning_threshold}")
 
     # Setup structures.
-    solution_pool = SolutionPool(branching_scheme, maximum_pool_size)
-    queue = SortedList()
-    history = {}
+    branching_scheme, statistics = setup_statistics(
+            branching_scheme, parameters)
+    solution_pool = parameters.get("solution_pool", None)
+    if solution_pool is None:
+        solution_pool = SolutionPool(branching_scheme, maximum_pool_size)
+    warm_start(branching_scheme, solution_pool, parameters)
+    next_children = get_next_children(branching_scheme)
+    less = get_less(branching_scheme)
+    termination = Termination(
+            branching_scheme, solution_pool, start, parameters)
+    termination.statistics = statistics
+    if queue_type == "sorted_list":
+        queue = new_sorted_list(branching_scheme)
+    elif queue_type == "heap":
+        queue = HeapQueue(key=getattr(branching_scheme, "key", None))
+    else:
+        raise ValueError(f"Unknown queue type: '{queue_type}'.")
+    if statistics is None:
+        history = History(branching_scheme)
+    else:
+        history = statistics.history(branching_scheme)
+        statistics.queue(queue)
+    checkpoint, state = setup_checkpoint(
+            branching_scheme, "best_first_search", parameters)
     number_of_nodes = 0
     maximum_size_of_the_queue = 1
+    number_of_pruned_nodes = 0
+    # Number of nodes added to the queue since the last pruning.
+    number_of_added_nodes = 0
+    # Becomes True when the worst solution of the pool improves, and False
+    # when the queue is swept.
+    pruning_pending = False
+    current_node = None
+
+    def save_checkpoint():
+        nodes = list(queue)
+        if current_node is not None:
+            nodes.append(current_node)
+        checkpoint.save(
+                {
+                    "algorithm": "best_first_search",
+                    "number_of_nodes": number_of_nodes,
+                    "maximum_size_of_the_queue": maximum_size_of_the_queue},
+                {
+                    "solutions": list(solution_pool.solutions),
+                    "queue": nodes})
+
     # Initial display.
     solution_pool.display_init(verbose)
 
-    # Initialize queue with root node.
-    root = branching_scheme.root()
-    add_to_history_and_queue(branching_scheme, history, queue, root)
-    current_node = None
+    if state is None:
+        # Initialize queue with root node.
+        root = branching_scheme.root()
+        add_to_history_and_queue(branching_scheme, history, queue, root)
+    else:
+        # Restore the state of the search from the checkpoint.
+        data, nodes = state
+        number_of_nodes = data["number_of_nodes"]
+        maximum_size_of_the_queue = data["maximum_size_of_the_queue"]
+        for solution in nodes["solutions"]:
+            if branching_scheme.better(solution, solution_pool.worst):
+                solution_pool.add(solution)
+        for node in nodes["queue"]:
+            add_to_history_and_queue(branching_scheme, history, queue, node)
+        # The queue may contain nodes bounded by the restored solutions.
+        pruning_pending = queue_pruning_threshold is not None
+        solution_pool.display("resumed", start, verbose)
 
     while current_node is not None or queue:
 
-        # Check time limit.
-        current_time = time.time()
-        if current_time - start > time_limit:
-            break
-
-        # Check node limit.
-        if number_of_nodes > maximum_number_of_nodes:
-            break
+        # Check termination.
+        if number_of_nodes >= termination.next_check:
+            if termination.stop(number_of_nodes, len(queue)):
+                break
+            # Save checkpoint.
+            if checkpoint is not None and checkpoint.due():
+                save_checkpoint()
+            yield search_event(
+                    "progress",
+                    solution_pool,
+                    start,
+                    number_of_nodes,
+                    queue_size=len(queue))
 
         # Update statistics.
         number_of_nodes += 1
@@ -75,9 +170,9 @@ def best_first_search(branching_scheme, **parameters):
                 current_node = None
                 continue
 
-        # Get next child.
-        child = branching_scheme.next_child(current_node)
-        if child is not None:
+        # Get next children.
+        worst = solution_pool.worst
+        for child in next_children(current_node):
             # Update best solution.
             if branching_scheme.better(child, solution_pool.worst):
                 display = branching_scheme.better(child, solution_pool.best)
@@ -91,6 +186,11 @@ def best_first_search(branching_scheme, **parameters):
                             "solution_pool": solution_pool,
                             "number_of_nodes": number_of_nodes
                             })
+                    yield search_event(
+                            "solution",
+                            solution_pool,
+                            start,
+                            number_of_nodes)
             # Add child to the queue.
             if (
                     not branching_scheme.leaf(child)
@@ -99,23 +199,52 @@ def best_first_search(branching_scheme, **parameters):
                 # Add child to the queue (and the history).
                 add_to_history_and_queue(
                         branching_scheme, history, queue, child)
+                number_of_added_nodes += 1
+
+        # Remove the nodes bounded by the new worst solution of the pool.
+        # The sweep is deferred until enough nodes have been added since the
+        # previous sweep, so that its cost is amortized.
+        if queue_pruning_threshold is not None:
+            if solution_pool.worst is not worst:
+                pruning_pending = True
+            if pruning_pending and number_of_added_nodes \
+                    >= queue_pruning_threshold * len(queue):
+                number_of_pruned_nodes += prune_queue(
+                        branching_scheme,
+                        history,
+                        queue,
+                        solution_pool.worst)
+                number_of_added_nodes = 0
+                pruning_pending = False
 
         # If current_node still has children, put it back to the queue.
         if branching_scheme.infertile(current_node):
             current_node = None
-        elif len(queue) > 0 and queue[0] < current_node:
+        elif len(queue) > 0 and less(queue[0], current_node):
             add_to_history_and_queue(
                     branching_scheme, history, queue, current_node)
             current_node = None
 
+    # Save the state of an interrupted search.
+    if checkpoint is not None and termination.reason is not None:
+        save_checkpoint()
+
     # Final display.
     solution_pool.display_end(start, verbose)
     if verbose:
         print(f"Number of nodes:             {number_of_nodes}")
+        if queue_pruning_threshold is not None:
+            print(f"Number of pruned nodes:      {number_of_pruned_nodes}")
 
-    end = time.time()
+    end = time.monotonic()
 
-    return {"solution_pool": solution_pool,
+    output = {
+            "solution_pool": solution_pool,
             "maximum_size_of_the_queue": maximum_size_of_the_queue,
+            "number_of_pruned_nodes": number_of_pruned_nodes,
             "number_of_nodes": number_of_nodes,
             "elapsed_time": end - start}
+    if statistics is not None:
+        statistics.report(output)
+    yield {"type": "end", **output}
+    return output
@@ -0,0 +1,108 @@
+import os
+import gzip
+import time
+import pickle
+
+
+CHECKPOINT_VERSION = 2
+
+
+class Checkpoint:
+    """Periodic checkpoints of the state of a search.
+
+    A checkpoint contains 'data', a dictionary of picklable values, and
+    'nodes', a dictionary of lists of nodes. If the branching scheme defines
+    'serialize_node(node)' and 'deserialize_node(data)', nodes are converted
+    with them; otherwise, each list is pickled. The checkpoint is compressed
+    with gzip and written to a temporary file which then replaces the
+    previous checkpoint, so that an interrupted write doesn't corrupt it.
+
+    """
+
+    def __init__(self, branching_scheme, path, interval):
+        self.branching_scheme = branching_scheme
+        self.path = path
+        self.interval = interval
+        self.next_save = time.monotonic() + interval
+
+    def due(self):
+        return time.monotonic() >= self.next_save
+
+    def serialize(self, node_list):
+        """Return a list of nodes in the form in which it is written.
+
+        The result is not affected by later changes of the nodes, so that a
+        state of the search can be captured and saved later.
+
+        """
+        serialize_node = getattr(
+                self.branching_scheme, "serialize_node", None)
+        if serialize_node is not None:
+            return [serialize_node(node) for node in node_list]
+        return pickle.dumps(list(node_list), protocol=pickle.HIGHEST_PROTOCOL)
+
+    def save(self, data, nodes, serialized_nodes=None):
+        """Write a checkpoint.
+
+        'serialized_nodes' is a dictionary of lists of nodes already
+        converted by 'serialize'.
+
+        """
+        content = {
+                "version": CHECKPOINT_VERSION,
+                "data": data,
+                "nodes": {
+                    **{
+                        name: self.serialize(node_list)
+                        for name, node_list in nodes.items()},
+                    **(serialized_nodes or {})}}
+        temporary_path = self.path + ".tmp"
+        with gzip.open(temporary_path, "wb", compresslevel=1) as f:
+            pickle.dump(content, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, self.path)
+        self.next_save = time.monotonic() + self.interval
+
+
+def load_checkpoint(branching_scheme, path):
+    """Read a checkpoint and return its data and its nodes."""
+    with gzip.open(path, "rb") as f:
+        content = pickle.load(f)
+    if content.get("version") != CHECKPOINT_VERSION:
+        raise ValueError(f"Unsupported checkpoint version in '{path}'.")
+    deserialize_node = getattr(branching_scheme, "deserialize_node", None)
+    if deserialize_node is not None:
+        nodes = {
+                name: [deserialize_node(data) for data in node_list]
+                for name, node_list in content["nodes"].items()}
+    else:
+        nodes = {
+                name: pickle.loads(node_list)
+                for name, node_list in content["nodes"].items()}
+    return content["data"], nodes
+
+
+def setup_checkpoint(branching_scheme, algorithm, parameters):
+    """Return the checkpoint and the resumed state used by an algorithm.
+
+    The checkpoint is None if the 'checkpoint_path' parameter is not set.
+    The resumed state is None if the 'resume_from' parameter is not set;
+    otherwise, it is the pair (data, nodes) of the checkpoint, whose
+    algorithm must be 'algorithm'.
+
+    """
+    checkpoint = None
+    checkpoint_path = parameters.get("checkpoint_path", None)
+    if checkpoint_path is not None:
+        checkpoint = Checkpoint(
+                branching_scheme,
+                checkpoint_path,
+                parameters.get("checkpoint_interval", 60))
+    state = None
+    resume_from = parameters.get("resume_from", None)
+    if resume_from is not None:
+        state = load_checkpoint(branching_scheme, resume_from)
+        if state[0].get("algorithm") != algorithm:
+            raise ValueError(
+                    f"Checkpoint '{resume_from}' has been written by "
+                    f"'{state[0].get('algorithm')}', not '{algorithm}'.")
+    return checkpoint, state
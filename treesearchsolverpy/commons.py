@@ -1,47 +1,113 @@
+import os
+import bisect
+import heapq
 import time
+import functools
+import itertools
+import operator
+import sys
+from sortedcontainers import SortedList, SortedKeyList
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+try:
+    PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    PAGE_SIZE = 4096
 
 
 class SolutionPool:
+    """Pool of the best solutions found.
+
+    Solutions are kept sorted from the best to the worst, so that inserting a
+    solution and evicting the worst one take a logarithmic number of calls to
+    'better'. If the branching scheme defines 'solution_hash(node)', only
+    the solutions with the same hash are compared with 'equals'.
+
+    A cutoff node can be set with 'set_cutoff'. Solutions which are not
+    better than it are then rejected, and it is used as the worst solution
+    as long as the pool doesn't contain a worse one, so that the algorithms
+    prune with it.
+
+    """
 
     def __init__(self, branching_scheme, maximum_size=1):
         self.branching_scheme = branching_scheme
         self.maximum_size = maximum_size
+        self.solution_hash = getattr(branching_scheme, "solution_hash", None)
+        self.hashes = {}
+        self.solution_hashes = {}
+        self.cutoff = None
         root = branching_scheme.root()
         self.best = root
         self.worst = root
-        self.solutions = [root]
+        self.solutions = SortedKeyList(
+                [root],
+                key=functools.cmp_to_key(self.compare))
+
+    def compare(self, node_1, node_2):
+        if self.branching_scheme.better(node_1, node_2):
+            return -1
+        if self.branching_scheme.better(node_2, node_1):
+            return 1
+        return 0
+
+    def set_cutoff(self, node):
+        self.cutoff = node
+        if self.branching_scheme.better(node, self.worst):
+            self.worst = node
 
     def add(self, node):
+        # If the new solution is not better than the cutoff, don't add it and
+        # stop.
+        if self.cutoff is not None \
+                and not self.branching_scheme.better(node, self.cutoff):
+            return False
         # If the new solution is worse than the worst solution of the pool,
         # don't add it and stop.
         if len(self.solutions) >= self.maximum_size:
             if not self.branching_scheme.better(node, self.worst):
                 return False
         # If the new solution is already in the pool, don't add it and stop.
-        for solution in self.solutions:
-            if self.branching_scheme.equals(node, solution):
-                return False
+        if self.solution_hash is None:
+            for solution in self.solutions:
+                if self.branching_scheme.equals(node, solution):
+                    return False
+        else:
+            node_hash = self.solution_hash(node)
+            solutions = self.hashes.get(node_hash)
+            if solutions is None:
+                solutions = []
+                self.hashes[node_hash] = solutions
+            for solution in solutions:
+                if self.branching_scheme.equals(node, solution):
+                    return False
+            solutions.append(node)
+            self.solution_hashes[id(node)] = node_hash
         # Add the new solution to solutions.
-        self.solutions.append(node)
-        # Update best solution.
-        if self.branching_scheme.better(node, self.best):
-            self.best = node
+        self.solutions.add(node)
         # Check the size of the solution pool.
         if len(self.solutions) > self.maximum_size:
             # Remove worst solution.
-            i = 0
-            while i < len(self.solutions):
-                if self.solutions[i] == self.worst:
-                    self.solutions[i] = self.solutions[-1]
-                    self.solutions.pop()
-                    break
-                else:
-                    i += 1
-            # Compute new worst solutions.
-            self.worst = self.solutions[0]
-            for solution in self.solutions:
-                if self.branching_scheme.better(self.worst, solution):
-                    self.worst = solution
+            worst = self.solutions.pop()
+            worst_hash = self.solution_hashes.pop(id(worst), None)
+            if worst_hash is not None:
+                solutions = self.hashes[worst_hash]
+                solutions[:] = [
+                        solution for solution in solutions
+                        if solution is not worst]
+                if not solutions:
+                    del self.hashes[worst_hash]
+            # Update worst solution.
+            self.worst = self.solutions[-1]
+            if self.cutoff is not None \
+                    and self.branching_scheme.better(self.cutoff, self.worst):
+                self.worst = self.cutoff
+        # Update best solution.
+        self.best = self.solutions[0]
 
         return True
 
@@ -61,13 +127,13 @@ class SolutionPool:
         if verbose:
             value = self.branching_scheme.display(self.best)
             print(
-                    '{:>11.3f}'.format(time.time() - start)
+                    '{:>11.3f}'.format(time.monotonic() - start)
                     + '{:>32}'.format(value)
                     + '{:>32}'.format(message))
 
     def display_end(self, start, verbose):
         if verbose:
-            current_time = time.time() - start
+            current_time = time.monotonic() - start
             value = self.branching_scheme.display(self.best)
             # print("-"*75)
             print()
@@ -77,54 +143,650 @@ class SolutionPool:
             print("Time:" + " " * 24 + '{:<11.3f}'.format(current_time))
 
 
-def add_to_history_and_queue(branching_scheme, history, queue, node):
-    # If node is not comparable, stop.
-    if branching_scheme.comparable(node):
+def resident_memory():
+    """Return the resident memory of the current process, in bytes."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * PAGE_SIZE
+    except OSError:
+        pass
+    # Fall back to the peak resident memory.
+    if resource is None:
+        return 0
+    maximum_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return maximum_rss
+    return maximum_rss * 1024
+
+
+class Termination:
+    """Termination criteria shared by the algorithms.
+
+    The algorithms count their nodes and call 'stop' once 'next_check' nodes
+    have been reached. The clock, the memory, the goal and the cancellation
+    event are only checked there. The number of nodes between two checks is
+    adapted so that checks happen about every 'check_period' seconds, and
+    the node limit is always checked exactly.
+
+    Parameters:
+    * time_limit: in seconds
+    * maximum_number_of_nodes
+    * memory_limit: in megabytes, resident memory of the process
+    * queue_size_limit: maximum size of the open list
+    * goal: the search stops as soon as a solution at least as good as
+      'branching_scheme.goal_node(goal)' is found
+    * cancel_event: object with an 'is_set()' method, for example a
+      threading.Event; the search stops when it is set
+
+    """
+
+    def __init__(self, branching_scheme, solution_pool, start, parameters):
+        self.branching_scheme = branching_scheme
+        self.solution_pool = solution_pool
+        self.synchronize = getattr(solution_pool, "synchronize", None)
+        self.start = start
+        self.time_limit = parameters.get(
+                "time_limit", float('inf'))
+        self.maximum_number_of_nodes = parameters.get(
+                "maximum_number_of_nodes", float('inf'))
+        self.memory_limit = parameters.get(
+                "memory_limit", float('inf'))
+        self.queue_size_limit = parameters.get(
+                "queue_size_limit", float('inf'))
+        self.cancel_event = parameters.get(
+                "cancel_event", None)
+        self.check_period = parameters.get(
+                "check_period", 0.01)
+        goal = parameters.get("goal", None)
+        self.goal_node = None
+        if goal is not None:
+            self.goal_node = branching_scheme.goal_node(goal)
+        self.reason = None
+        self.number_of_nodes_between_checks = 1
+        self.last_check_time = start
+        self.last_check_number_of_nodes = 0
+        self.next_check = 0
+        # Set by the algorithms when statistics are collected.
+        self.statistics = None
+
+    def stop(self, number_of_nodes, queue_size=0):
+        if self.reason is None:
+            self.reason = self.check(number_of_nodes, queue_size)
+            if self.statistics is not None:
+                self.statistics.sample(number_of_nodes, queue_size)
+        if self.reason is not None:
+            self.next_check = 0
+            return True
+        return False
+
+    def check(self, number_of_nodes, queue_size):
+        # Check node limit.
+        if number_of_nodes > self.maximum_number_of_nodes:
+            return "node limit"
+        # Check time limit.
+        current_time = time.monotonic()
+        if current_time - self.start > self.time_limit:
+            return "time limit"
+        # Check external cancellation.
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            return "cancelled"
+        # Check queue size.
+        if queue_size > self.queue_size_limit:
+            return "queue size limit"
+        # Check memory.
+        if (
+                self.memory_limit != float('inf')
+                and resident_memory() > self.memory_limit * 1024 * 1024):
+            return "memory limit"
+        # Import the solutions found by other processes.
+        if self.synchronize is not None:
+            self.synchronize()
+        # Check goal.
+        if self.goal_node is not None and not self.branching_scheme.better(
+                self.goal_node, self.solution_pool.best):
+            return "goal"
+
+        # Calibrate the number of nodes until the next check.
+        elapsed_time = current_time - self.last_check_time
+        if number_of_nodes > self.last_check_number_of_nodes:
+            if elapsed_time < self.check_period / 2:
+                self.number_of_nodes_between_checks = min(
+                        2 * self.number_of_nodes_between_checks, 1 << 16)
+            elif elapsed_time > 2 * self.check_period:
+                self.number_of_nodes_between_checks = max(
+                        self.number_of_nodes_between_checks // 2, 1)
+        self.last_check_time = current_time
+        self.last_check_number_of_nodes = number_of_nodes
+        self.next_check = min(
+                number_of_nodes + self.number_of_nodes_between_checks,
+                self.maximum_number_of_nodes + 1)
+        return None
+
+
+class HeapQueue:
+    """Binary heap with lazy deletion.
+
+    It provides the subset of the 'SortedList' interface used by the
+    algorithms on their open list. Removed nodes are only marked and are
+    discarded when they reach the top of the heap or when the heap is
+    compacted.
+
+    If 'key' is set, the heap contains entries (key(node), counter, node),
+    so that the nodes themselves are never compared.
+
+    """
+
+    def __init__(self, compaction_factor=2, key=None):
+        self.heap = []
+        self.removed = {}
+        self.number_of_removed = 0
+        self.compaction_factor = compaction_factor
+        self.key = key
+        self.counter = itertools.count()
+
+    def __len__(self):
+        return len(self.heap) - self.number_of_removed
+
+    def node(self, entry):
+        return entry if self.key is None else entry[2]
+
+    def __iter__(self):
+        # Iterate over the nodes which have not been removed, in any order.
+        removed = dict(self.removed)
+        for entry in self.heap:
+            node = self.node(entry)
+            key = id(node)
+            count = removed.get(key)
+            if count is None:
+                yield node
+            elif count == 1:
+                del removed[key]
+            else:
+                removed[key] = count - 1
+
+    def __getitem__(self, pos):
+        if pos != 0:
+            raise IndexError("HeapQueue only gives access to its first node.")
+        self.discard_removed()
+        return self.node(self.heap[0])
+
+    def add(self, node):
+        if self.key is None:
+            heapq.heappush(self.heap, node)
+        else:
+            heapq.heappush(
+                    self.heap, (self.key(node), next(self.counter), node))
+
+    def pop(self, pos=0):
+        if pos != 0:
+            raise IndexError("HeapQueue can only pop its first node.")
+        self.discard_removed()
+        return self.node(heapq.heappop(self.heap))
+
+    def remove(self, node):
+        # Mark the node as removed. Nodes are identified by their id, which
+        # remains valid since the heap still references them.
+        key = id(node)
+        self.removed[key] = self.removed.get(key, 0) + 1
+        self.number_of_removed += 1
+        # Compact the heap if it contains too many removed nodes.
+        if (
+                self.number_of_removed > 1024
+                and len(self.heap) > self.compaction_factor * len(self)):
+            self.compact()
+
+    def clear(self):
+        self.heap.clear()
+        self.removed.clear()
+        self.number_of_removed = 0
+
+    def prune(self, predicate):
+        """Remove the nodes satisfying 'predicate' and return them."""
+        self.compact()
+        heap = []
+        pruned_nodes = []
+        for entry in self.heap:
+            node = self.node(entry)
+            if predicate(node):
+                pruned_nodes.append(node)
+            else:
+                heap.append(entry)
+        heapq.heapify(heap)
+        self.heap = heap
+        return pruned_nodes
+
+    def discard_removed(self):
+        heap = self.heap
+        removed = self.removed
+        while heap and removed:
+            key = id(self.node(heap[0]))
+            count = removed.get(key)
+            if count is None:
+                return
+            if count == 1:
+                del removed[key]
+            else:
+                removed[key] = count - 1
+            self.number_of_removed -= 1
+            heapq.heappop(heap)
+
+    def compact(self):
+        heap = []
+        removed = self.removed
+        for entry in self.heap:
+            key = id(self.node(entry))
+            count = removed.get(key)
+            if count is None:
+                heap.append(entry)
+            elif count == 1:
+                del removed[key]
+            else:
+                removed[key] = count - 1
+        heapq.heapify(heap)
+        self.heap = heap
+        self.number_of_removed = 0
+
+
+class BoundedBeam:
+    """Container keeping the best 'maximum_size' nodes added to it.
+
+    Nodes are appended to an unsorted buffer. When the buffer reaches twice
+    the maximum size, the best nodes are selected and the others are evicted.
+    'worst' is the worst node kept by the last selection; nodes which are not
+    better than it can be rejected without being added. The nodes are only
+    sorted by the selections.
+
+    If 'key' is set, the key of each node is computed when it is added, and
+    the nodes are sorted by key. A caller which has already computed the key
+    of a node can pass it to 'accepts' and 'add' instead.
+
+    """
+
+    def __init__(self, maximum_size, evict=None, key=None):
+        self.maximum_size = maximum_size
+        self.evict = evict
+        self.key = key
+        self.nodes = []
+        # Keys of the nodes, if 'key' is set.
+        self.keys = []
+        self.removed = set()
+        self.worst = None
+        self.worst_key = None
+
+    def __len__(self):
+        return len(self.nodes) - len(self.removed)
+
+    def full(self):
+        return len(self) >= self.maximum_size
+
+    def accepts(self, node, key=None):
+        if len(self) < self.maximum_size or self.worst is None:
+            return True
+        if self.key is None:
+            return node < self.worst
+        if key is None:
+            key = self.key(node)
+        return key < self.worst_key
+
+    def rejects(self, node):
+        """Return True if the beam is full and its worst node is better than
+        'node'."""
+        if not self.full() or self.worst is None:
+            return False
+        if self.key is None:
+            return self.worst < node
+        return self.worst_key < self.key(node)
+
+    def add(self, node, key=None):
+        self.nodes.append(node)
+        if self.key is not None:
+            self.keys.append(self.key(node) if key is None else key)
+        if len(self) >= 2 * self.maximum_size:
+            self.select()
+
+    def remove(self, node):
+        self.removed.add(id(node))
+
+    def clear(self):
+        self.nodes.clear()
+        self.keys.clear()
+        self.removed.clear()
+        self.worst = None
+        self.worst_key = None
+
+    def select(self):
+        nodes = self.nodes
+        keys = self.keys
+        removed = self.removed
+        if self.key is None:
+            if removed:
+                nodes = [node for node in nodes if id(node) not in removed]
+                removed.clear()
+            nodes.sort()
+        else:
+            positions = range(len(nodes))
+            if removed:
+                positions = [
+                        pos for pos in positions
+                        if id(nodes[pos]) not in removed]
+                removed.clear()
+            positions = sorted(positions, key=keys.__getitem__)
+            nodes = [nodes[pos] for pos in positions]
+            keys = [keys[pos] for pos in positions]
+        if len(nodes) > self.maximum_size:
+            evicted = nodes[self.maximum_size:]
+            del nodes[self.maximum_size:]
+            del keys[self.maximum_size:]
+            if self.evict is not None:
+                for node in evicted:
+                    self.evict(node)
+        self.nodes = nodes
+        self.keys = keys
+        if len(nodes) >= self.maximum_size:
+            self.worst = nodes[-1]
+            if self.key is not None:
+                self.worst_key = keys[-1]
+        return nodes
+
+
+def get_less(branching_scheme):
+    # If the branching scheme defines 'key(node)', compare the keys of the
+    # nodes. Otherwise, compare the nodes themselves.
+    key = getattr(branching_scheme, "key", None)
+    if key is None:
+        return operator.lt
+
+    def less(node_1, node_2):
+        return key(node_1) < key(node_2)
+
+    return less
+
+
+def new_sorted_list(branching_scheme, nodes=()):
+    """Return a sorted list of nodes, sorted by 'key(node)' if the branching
+    scheme defines it.
+
+    With a key, the keys are computed once per insertion and compared
+    directly, without calling the comparison methods of the nodes.
+
+    """
+    key = getattr(branching_scheme, "key", None)
+    if key is None:
+        return SortedList(nodes)
+    return SortedKeyList(nodes, key=key)
+
+
+def search_event(event_type, solution_pool, start, number_of_nodes, **values):
+    """Return an event yielded by the iterator version of an algorithm.
+
+    The type of an event is 'solution' when a new best solution has been
+    found, 'progress' at each termination check, and 'end' at the end of the
+    search, in which case the event also contains the output of the
+    algorithm.
+
+    """
+    return {
+            "type": event_type,
+            "solution_pool": solution_pool,
+            "number_of_nodes": number_of_nodes,
+            "elapsed_time": time.monotonic() - start,
+            **values}
+
+
+def run(events):
+    """Consume the events of the iterator version of an algorithm and return
+    its output."""
+    try:
+        while True:
+            next(events)
+    except StopIteration as stop:
+        return stop.value
+
+
+def warm_start(branching_scheme, solution_pool, parameters):
+    """Set the cutoff and add the initial solutions to the solution pool.
+
+    Parameters:
+    * cutoff: objective value; only solutions strictly better than
+      'branching_scheme.goal_node(cutoff)' are searched
+    * initial_solutions: list of solution nodes
+    * initial_certificates: list of solutions in the format returned by
+      'to_solution', converted to nodes with
+      'branching_scheme.from_solution(certificate)'
+
+    """
+    cutoff = parameters.get("cutoff", None)
+    if cutoff is not None:
+        solution_pool.set_cutoff(branching_scheme.goal_node(cutoff))
+    initial_solutions = list(parameters.get("initial_solutions", []))
+    for certificate in parameters.get("initial_certificates", []):
+        initial_solutions.append(branching_scheme.from_solution(certificate))
+    for solution in initial_solutions:
+        if branching_scheme.better(solution, solution_pool.worst):
+            solution_pool.add(solution)
+
+
+def get_next_children(branching_scheme):
+    # If the branching scheme generates its children in batches, use it
+    # directly. Otherwise, wrap 'next_child' so that it returns a tuple of 0
+    # or 1 child.
+    next_children = getattr(branching_scheme, "next_children", None)
+    if next_children is not None:
+        return next_children
+
+    next_child = branching_scheme.next_child
+
+    def next_children(node):
+        child = next_child(node)
+        if child is None:
+            return ()
+        return (child, )
+
+    return next_children
+
+
+class History:
+    """Dominance history.
+
+    Comparable nodes are stored by bucket. The structure used for a bucket
+    depends on the branching scheme:
+    * If it defines 'dominance_key(node)' returning a number, node_1
+      dominates node_2 if and only if its key is smaller or equal. A bucket
+      then contains at most one node.
+    * If 'dominance_key(node)' returns a pair, node_1 dominates node_2 if and
+      only if both elements of its key are smaller or equal. A bucket then
+      contains a Pareto front sorted by first element.
+    * Otherwise, 'dominates(node_1, node_2)' is called for each node of the
+      bucket. Nodes are indexed by id so that they can be removed in constant
+      time.
+
+    """
+
+    def __init__(self, branching_scheme):
+        self.branching_scheme = branching_scheme
+        self.dominance_key = getattr(branching_scheme, "dominance_key", None)
+        self.buckets = {}
+        self.number_of_nodes = 0
+
+    def __len__(self):
+        return self.number_of_nodes
+
+    def clear(self):
+        self.buckets.clear()
+        self.number_of_nodes = 0
+
+    def add(self, node, queue):
+        """Add a node to the history.
+
+        Remove the nodes it dominates from the history and from the queue.
+        Return False if the node is dominated.
+
+        """
+        branching_scheme = self.branching_scheme
         bucket = branching_scheme.Bucket(node)
-        if bucket not in history:
-            history[bucket] = []
-        list_of_nodes = history[bucket]
+        if self.dominance_key is None:
+            return self.add_generic(bucket, node, queue)
+        key = self.dominance_key(node)
+        if type(key) is tuple:
+            return self.add_pareto(bucket, key, node, queue)
+        return self.add_scalar(bucket, key, node, queue)
 
+    def add_scalar(self, bucket, key, node, queue):
+        entry = self.buckets.get(bucket)
+        if entry is None:
+            self.buckets[bucket] = [key, node]
+            self.number_of_nodes += 1
+            return True
         # Check if node is dominated.
-        for n in list_of_nodes:
+        if entry[0] <= key:
+            return False
+        # Replace the dominated node.
+        queue.remove(entry[1])
+        entry[0] = key
+        entry[1] = node
+        return True
+
+    def add_pareto(self, bucket, key, node, queue):
+        front = self.buckets.get(bucket)
+        if front is None:
+            front = ([], [], [])
+            self.buckets[bucket] = front
+        firsts, seconds, nodes = front
+        key_1, key_2 = key
+        # Check if node is dominated. Along the front, the second elements of
+        # the keys are decreasing, so only the last node with a smaller or
+        # equal first element needs to be checked.
+        pos = bisect.bisect_right(firsts, key_1)
+        if pos > 0 and seconds[pos - 1] <= key_2:
+            return False
+        # Remove dominated nodes. They are consecutive, starting from the
+        # first node with a greater or equal first element.
+        pos_begin = bisect.bisect_left(firsts, key_1)
+        pos_end = pos_begin
+        while pos_end < len(nodes) and seconds[pos_end] >= key_2:
+            queue.remove(nodes[pos_end])
+            pos_end += 1
+        self.number_of_nodes -= pos_end - pos_begin
+        firsts[pos_begin:pos_end] = [key_1]
+        seconds[pos_begin:pos_end] = [key_2]
+        nodes[pos_begin:pos_end] = [node]
+        self.number_of_nodes += 1
+        return True
+
+    def add_generic(self, bucket, node, queue):
+        branching_scheme = self.branching_scheme
+        nodes = self.buckets.get(bucket)
+        if nodes is None:
+            nodes = {}
+            self.buckets[bucket] = nodes
+        # Check if node is dominated.
+        for n in nodes.values():
             if branching_scheme.dominates(n, node):
                 return False
-
         # Remove dominated nodes from history and queue.
-        index = 0
-        while index < len(list_of_nodes):
-            n = list_of_nodes[index]
-            if branching_scheme.dominates(node, n):
-                queue.remove(n)
-                list_of_nodes[index] = list_of_nodes[-1]
-                list_of_nodes.pop()
-            else:
-                index += 1
-
+        dominated_nodes = [
+                n for n in nodes.values()
+                if branching_scheme.dominates(node, n)]
+        for n in dominated_nodes:
+            queue.remove(n)
+            del nodes[id(n)]
+        self.number_of_nodes -= len(dominated_nodes)
         # Add node to history.
-        list_of_nodes.append(node)
+        nodes[id(node)] = node
+        self.number_of_nodes += 1
+        return True
 
-    # Add to queue.
-    queue.add(node)
+    def remove(self, node):
+        bucket = self.branching_scheme.Bucket(node)
+        content = self.buckets.get(bucket)
+        if content is None:
+            return
+        if self.dominance_key is None:
+            if content.pop(id(node), None) is None:
+                return
+            if not content:
+                del self.buckets[bucket]
+        elif type(content) is list:
+            if content[1] is not node:
+                return
+            del self.buckets[bucket]
+        else:
+            firsts, seconds, nodes = content
+            key_1 = self.dominance_key(node)[0]
+            pos = bisect.bisect_left(firsts, key_1)
+            while pos < len(nodes) and nodes[pos] is not node:
+                pos += 1
+            if pos == len(nodes):
+                return
+            del firsts[pos]
+            del seconds[pos]
+            del nodes[pos]
+            if not nodes:
+                del self.buckets[bucket]
+        self.number_of_nodes -= 1
+
+
+def add_to_history_and_queue(
+        branching_scheme, history, queue, node, key=None):
+    # If node is not comparable, don't add it to the history.
+    if branching_scheme.comparable(node):
+        if not history.add(node, queue):
+            return False
+
+    # Add to queue. 'key' is the key of node, if it has already been computed
+    # for a BoundedBeam.
+    if key is None:
+        queue.add(node)
+    else:
+        queue.add(node, key)
 
     return True
 
 
 def remove_from_history(branching_scheme, history, node):
     if branching_scheme.comparable(node):
-        bucket = branching_scheme.Bucket(node)
-        list_of_nodes = history[bucket]
-        index = 0
-        while index < len(list_of_nodes):
-            node_2 = list_of_nodes[index]
-            if node_2 is node:
-                list_of_nodes[index] = list_of_nodes[-1]
-                list_of_nodes.pop()
-                if not list_of_nodes:
-                    del history[bucket]
-                return
+        history.remove(node)
+
+
+def prune_queue(branching_scheme, history, queue, worst):
+    """Remove the nodes of the queue bounded by 'worst' from the queue and
+    from the history, and return their number.
+
+    If the branching scheme has an attribute 'monotone_bound' set to True,
+    that is, if 'bound(node_2, worst)' holds whenever 'bound(node_1, worst)'
+    holds and node_1 < node_2, the bounded nodes of a sorted queue form its
+    tail; it is found by binary search and removed with a single slice.
+    Otherwise, all the nodes are checked.
+
+    """
+    bound = branching_scheme.bound
+    if isinstance(queue, HeapQueue):
+        pruned_nodes = queue.prune(lambda node: bound(node, worst))
+    elif getattr(branching_scheme, "monotone_bound", False):
+        pos_min = 0
+        pos_max = len(queue)
+        while pos_min < pos_max:
+            pos = (pos_min + pos_max) // 2
+            if bound(queue[pos], worst):
+                pos_max = pos
+            else:
+                pos_min = pos + 1
+        pruned_nodes = queue[pos_min:]
+        del queue[pos_min:]
+    else:
+        kept_nodes = []
+        pruned_nodes = []
+        for node in queue:
+            if bound(node, worst):
+                pruned_nodes.append(node)
             else:
-                index += 1
+                kept_nodes.append(node)
+        if pruned_nodes:
+            queue.clear()
+            queue.update(kept_nodes)
+    for node in pruned_nodes:
+        remove_from_history(branching_scheme, history, node)
+    return len(pruned_nodes)
 
 
 def remove_from_history_and_queue(branching_scheme, history, queue, pos):
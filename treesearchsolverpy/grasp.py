@@ -0,0 +1,239 @@
+from .commons import SolutionPool, \
+                     Termination, \
+                     warm_start, \
+                     search_event, \
+                     run
+from .greedy import greedy
+from .statistics import setup_statistics
+
+import time
+import collections
+import multiprocessing
+
+
+# Branching scheme of the worker processes.
+worker_branching_scheme = None
+
+
+def worker_initializer(branching_scheme):
+    global worker_branching_scheme
+    worker_branching_scheme = branching_scheme
+
+
+def descent(
+        branching_scheme,
+        solution_pool,
+        seed,
+        alpha,
+        start,
+        time_limit,
+        maximum_number_of_nodes):
+    """Run a randomized greedy descent and return its number of nodes."""
+    output = greedy(
+            branching_scheme,
+            solution_pool=solution_pool,
+            seed=seed,
+            alpha=alpha,
+            time_limit=time_limit - (time.monotonic() - start),
+            maximum_number_of_nodes=maximum_number_of_nodes,
+            verbose=False)
+    return output["number_of_nodes"]
+
+
+def worker_descent(arguments):
+    (
+            seed,
+            alpha,
+            solutions,
+            cutoff,
+            maximum_pool_size,
+            start,
+            time_limit,
+            maximum_number_of_nodes) = arguments
+    branching_scheme = worker_branching_scheme
+    # The worker uses its own solution pool.
+    solution_pool = SolutionPool(branching_scheme, maximum_pool_size)
+    if cutoff is not None:
+        solution_pool.set_cutoff(cutoff)
+    for solution in solutions:
+        if branching_scheme.better(solution, solution_pool.worst):
+            solution_pool.add(solution)
+    number_of_nodes = descent(
+            branching_scheme,
+            solution_pool,
+            seed,
+            alpha,
+            start,
+            time_limit,
+            maximum_number_of_nodes)
+    return list(solution_pool.solutions), number_of_nodes
+
+
+def grasp(branching_scheme, **parameters):
+    return run(grasp_iterator(branching_scheme, **parameters))
+
+
+def grasp_iterator(branching_scheme, **parameters):
+    """Iterator version of 'grasp'.
+
+    Yield the events of the search (see 'search_event') and return its
+    output.
+
+    """
+    # Read parameters.
+    start = time.monotonic()
+    maximum_pool_size = parameters.get(
+            "maximum_pool_size", 1)
+    alpha = parameters.get(
+            "alpha", 0.1)
+    seed = parameters.get(
+            "seed", 0)
+    number_of_descents = parameters.get(
+            "number_of_descents", None)
+    number_of_workers = parameters.get(
+            "number_of_workers", 1)
+    maximum_number_of_nodes = parameters.get(
+            "maximum_number_of_nodes", float('inf'))
+    time_limit = parameters.get(
+            "time_limit", float('inf'))
+    verbose = parameters.get(
+            "verbose", True)
+    # Without a time limit nor a node limit, the number of descents must be
+    # bounded for the search to terminate.
+    if number_of_descents is None:
+        if time_limit == float('inf') \
+                and maximum_number_of_nodes == float('inf'):
+            number_of_descents = 100
+        else:
+            number_of_descents = float('inf')
+
+    if verbose:
+        print("======================================")
+        print("           TreeSearchSolver           ")
+        print("======================================")
+        print()
+        print("Algorithm")
+        print("---------")
+        print("GRASP")
+        print()
+        print("Parameters")
+        print("----------")
+        print(f"Alpha:                      {alpha}")
+        print(f"Seed:                       {seed}")
+        print(f"Number of descents:         {number_of_descents}")
+        print(f"Number of workers:          {number_of_workers}")
+        print(f"Maximum number of nodes:    {maximum_number_of_nodes}")
+        print(f"Maximum pool size:          {maximum_pool_size}")
+        print(f"Time limit:                 {time_limit}")
+
+    # Setup structures.
+    branching_scheme, statistics = setup_statistics(
+            branching_scheme, parameters)
+    solution_pool = parameters.get("solution_pool", None)
+    if solution_pool is None:
+        solution_pool = SolutionPool(branching_scheme, maximum_pool_size)
+    warm_start(branching_scheme, solution_pool, parameters)
+    termination = Termination(
+            branching_scheme, solution_pool, start, parameters)
+    termination.statistics = statistics
+
+    # The workers receive a copy of the branching scheme once, when they are
+    # started.
+    pool = None
+    if number_of_workers > 1:
+        pool = multiprocessing.Pool(
+                number_of_workers,
+                initializer=worker_initializer,
+                initargs=(branching_scheme, ))
+    # Descents sent to the workers and not merged yet. At most two descents
+    # per worker are pending, so that each one starts from a recent solution
+    # pool, and they are merged in the order of their seeds.
+    pending = collections.deque()
+    descent_id = 0
+    number_of_nodes = 0
+
+    # Initial display.
+    solution_pool.display_init(verbose)
+
+    try:
+        while True:
+            if pool is None:
+                if descent_id >= number_of_descents:
+                    break
+                best = solution_pool.best
+                number_of_nodes += descent(
+                        branching_scheme,
+                        solution_pool,
+                        seed + descent_id,
+                        alpha,
+                        start,
+                        time_limit,
+                        maximum_number_of_nodes - number_of_nodes)
+                descent_id += 1
+            else:
+                while (
+                        len(pending) < 2 * number_of_workers
+                        and descent_id < number_of_descents):
+                    pending.append(pool.apply_async(worker_descent, ((
+                        seed + descent_id,
+                        alpha,
+                        list(solution_pool.solutions),
+                        solution_pool.cutoff,
+                        maximum_pool_size,
+                        start,
+                        time_limit,
+                        maximum_number_of_nodes - number_of_nodes), )))
+                    descent_id += 1
+                if not pending:
+                    break
+                # Merge the solution pool of the oldest descent.
+                solutions, n = pending.popleft().get()
+                number_of_nodes += n
+                best = solution_pool.best
+                for solution in solutions:
+                    if branching_scheme.better(solution, solution_pool.worst):
+                        solution_pool.add(solution)
+
+            if solution_pool.best is not best:
+                message = f"descent {descent_id}"
+                solution_pool.display(message, start, verbose)
+                yield search_event(
+                        "solution",
+                        solution_pool,
+                        start,
+                        number_of_nodes)
+
+            # Check termination.
+            if termination.stop(number_of_nodes):
+                break
+            yield search_event(
+                    "progress",
+                    solution_pool,
+                    start,
+                    number_of_nodes,
+                    number_of_descents=descent_id - len(pending))
+    finally:
+        # The remaining descents are not needed anymore.
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+    number_of_descents = descent_id - len(pending)
+
+    # Final display.
+    solution_pool.display_end(start, verbose)
+    if verbose:
+        print(f"Number of nodes:             {number_of_nodes}")
+        print(f"Number of descents:          {number_of_descents}")
+
+    end = time.monotonic()
+
+    output = {
+            "solution_pool": solution_pool,
+            "number_of_descents": number_of_descents,
+            "number_of_nodes": number_of_nodes,
+            "elapsed_time": end - start}
+    if statistics is not None:
+        statistics.report(output)
+    yield {"type": "end", **output}
+    return output
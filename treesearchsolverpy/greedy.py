@@ -1,14 +1,36 @@
-from .commons import SolutionPool
+from .commons import SolutionPool, \
+                     Termination, \
+                     warm_start, \
+                     search_event, \
+                     run, \
+                     get_next_children, \
+                     get_less
+from .statistics import setup_statistics
+from .checkpoint import setup_checkpoint
 
+import math
 import time
+import heapq
 import random
 
 
 def greedy(branching_scheme, **parameters):
+    return run(greedy_iterator(branching_scheme, **parameters))
+
+
+def greedy_iterator(branching_scheme, **parameters):
+    """Iterator version of 'greedy'.
+
+    Yield the events of the search (see 'search_event') and return its
+    output.
+
+    """
     # Read parameters.
-    start = time.time()
+    start = time.monotonic()
     seed = parameters.get(
             "seed", 0)
+    alpha = parameters.get(
+            "alpha", 0)
     maximum_pool_size = parameters.get(
             "maximum_pool_size", 1)
     time_limit = parameters.get(
@@ -29,40 +51,107 @@ def greedy(branching_scheme, **parameters):
         print("----------")
         print(f"Maximum pool size:          {maximum_pool_size}")
         print(f"Seed:                       {seed}")
+        print(f"Alpha:                      {alpha}")
         print(f"Time limit:                 {time_limit}")
 
     random.seed(seed)
 
-    solution_pool = SolutionPool(branching_scheme, maximum_pool_size)
+    branching_scheme, statistics = setup_statistics(
+            branching_scheme, parameters)
+    solution_pool = parameters.get("solution_pool", None)
+    if solution_pool is None:
+        solution_pool = SolutionPool(branching_scheme, maximum_pool_size)
+    warm_start(branching_scheme, solution_pool, parameters)
+    next_children = get_next_children(branching_scheme)
+    less = get_less(branching_scheme)
+    key = getattr(branching_scheme, "key", None)
+    termination = Termination(
+            branching_scheme, solution_pool, start, parameters)
+    termination.statistics = statistics
+    checkpoint, state = setup_checkpoint(
+            branching_scheme, "greedy", parameters)
     number_of_nodes = 0
 
-    current_node = branching_scheme.root()
+    def save_checkpoint():
+        checkpoint.save(
+                {
+                    "algorithm": "greedy",
+                    "number_of_nodes": number_of_nodes,
+                    "random_state": random.getstate()},
+                {
+                    "solutions": list(solution_pool.solutions),
+                    "current_node": [current_node]})
+
+    if state is None:
+        current_node = branching_scheme.root()
+    else:
+        # Restore the state of the search from the checkpoint.
+        data, nodes = state
+        number_of_nodes = data["number_of_nodes"]
+        random.setstate(data["random_state"])
+        for solution in nodes["solutions"]:
+            if branching_scheme.better(solution, solution_pool.worst):
+                solution_pool.add(solution)
+        current_node = nodes["current_node"][0]
 
     while True:
 
-        # Check time limit.
-        current_time = time.time()
-        if current_time - start > time_limit:
-            break
+        # Check termination.
+        if number_of_nodes >= termination.next_check:
+            if termination.stop(number_of_nodes):
+                break
+            # Save checkpoint.
+            if checkpoint is not None and checkpoint.due():
+                save_checkpoint()
+            yield search_event(
+                    "progress", solution_pool, start, number_of_nodes)
 
         number_of_nodes += 1
 
         # Generate children.
         best_child = None
+        # In randomized mode, all the children are generated, and the next
+        # node is drawn among the best 'alpha' fraction of them, and at least
+        # among the best two, so that nodes with few children are randomized
+        # as well.
+        candidates = []
         while not branching_scheme.infertile(current_node):
-            if best_child is not None \
-                    and best_child < current_node:
+            # The key of the best child has already been computed.
+            if alpha == 0 \
+                    and best_child is not None \
+                    and (
+                        less(best_child, current_node) if key is None
+                        else best_key < key(current_node)):
                 break
-            child = branching_scheme.next_child(current_node)
-            if child is None:
-                continue
-            # Update best solution.
-            if branching_scheme.better(child, solution_pool.worst):
-                solution_pool.add(child)
-            if branching_scheme.leaf(child):
-                continue
-            if best_child is None or best_child > child:
-                best_child = child
+            for child in next_children(current_node):
+                # Update best solution.
+                if branching_scheme.better(child, solution_pool.worst):
+                    improved = branching_scheme.better(
+                            child, solution_pool.best)
+                    solution_pool.add(child)
+                    if improved:
+                        yield search_event(
+                                "solution",
+                                solution_pool,
+                                start,
+                                number_of_nodes)
+                if branching_scheme.leaf(child):
+                    continue
+                if alpha > 0:
+                    candidates.append(child)
+                elif key is None:
+                    if best_child is None or child < best_child:
+                        best_child = child
+                else:
+                    # Compute the key of each child once.
+                    child_key = key(child)
+                    if best_child is None or child_key < best_key:
+                        best_child = child
+                        best_key = child_key
+        if candidates:
+            size = max(2, math.ceil(alpha * len(candidates)))
+            best_child = random.choice(heapq.nsmallest(
+                    size, candidates, key=key))
 
         # Stop criteria.
         if best_child is None:
@@ -70,13 +159,22 @@ def greedy(branching_scheme, **parameters):
         # Update current_node.
         current_node = best_child
 
+    # Save the state of an interrupted search.
+    if checkpoint is not None and termination.reason is not None:
+        save_checkpoint()
+
     # Final display.
     solution_pool.display_end(start, verbose)
     if verbose:
         print(f"Number of nodes:             {number_of_nodes}")
 
-    end = time.time()
+    end = time.monotonic()
 
-    return {"solution_pool": solution_pool,
+    output = {
+            "solution_pool": solution_pool,
             "number_of_nodes": number_of_nodes,
             "elapsed_time": end - start}
+    if statistics is not None:
+        statistics.report(output)
+    yield {"type": "end", **output}
+    return output
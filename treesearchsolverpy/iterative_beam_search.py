@@ -1,15 +1,188 @@
 from .commons import SolutionPool, \
+                     Termination, \
+                     History, \
+                     BoundedBeam, \
+                     warm_start, \
+                     search_event, \
+                     run, \
+                     get_next_children, \
+                     get_less, \
+                     new_sorted_list, \
                      add_to_history_and_queue, \
-                     remove_from_history_and_queue
+                     remove_from_history
+from .statistics import setup_statistics
+from .checkpoint import setup_checkpoint
 
 import math
 import time
-from sortedcontainers import SortedList
+import multiprocessing
+
+
+def expand_layer(
+        branching_scheme,
+        next_children,
+        q,
+        q_next,
+        history,
+        solution_pool,
+        termination,
+        number_of_nodes):
+    """Expand the nodes of q and add the best children to q_next.
+
+    Return the updated number of nodes, whether non-dominated nodes have been
+    pruned and whether the search must be terminated. Improving
+    children are added to the solution pool; the list of the ones which have
+    been accepted is returned last. This is a generator yielding the events
+    of the search.
+
+    """
+    less = get_less(branching_scheme)
+    key = getattr(branching_scheme, "key", None)
+    pruned = False
+    end = False
+    new_solutions = []
+    current_node = None
+    while current_node is not None or q:
+        # Check termination.
+        if number_of_nodes >= termination.next_check:
+            if termination.stop(number_of_nodes, len(q_next)):
+                end = True
+                break
+            yield search_event(
+                    "progress",
+                    solution_pool,
+                    termination.start,
+                    number_of_nodes,
+                    queue_size=len(q) + len(q_next))
+
+        number_of_nodes += 1
+
+        # Get the next processed node from the queue.
+        if current_node is None:
+            current_node = q.pop(0)
+            # Check bound.
+            if branching_scheme.bound(
+                    current_node, solution_pool.worst):
+                current_node = None
+                continue
+
+        # Update stop.
+        if q_next.rejects(current_node):
+            pruned = True
+            break
+
+        # Get next children.
+        for child in next_children(current_node):
+            # Update best solution.
+            if branching_scheme.better(child, solution_pool.worst):
+                best = solution_pool.best
+                if solution_pool.add(child):
+                    new_solutions.append(child)
+                    if solution_pool.best is not best:
+                        yield search_event(
+                                "solution",
+                                solution_pool,
+                                termination.start,
+                                number_of_nodes)
+            # Add child to the queue.
+            if (
+                    not branching_scheme.leaf(child)
+                    and not branching_scheme.bound(
+                        child, solution_pool.worst)):
+                # Update stop.
+                if q_next.full():
+                    pruned = True
+                # Check if it is worth adding the child to the next
+                # queue. The key of the child is computed once for both.
+                child_key = None if key is None else key(child)
+                if q_next.accepts(child, child_key):
+                    # Add child to the queue (and the history). If
+                    # the beam becomes too large, the less interesting
+                    # nodes are evicted.
+                    add_to_history_and_queue(
+                            branching_scheme,
+                            history,
+                            q_next,
+                            child,
+                            child_key)
+
+        # If current_node still has children, put it back to the queue.
+        if branching_scheme.infertile(current_node):
+            current_node = None
+        elif len(q) > 0 and less(q[0], current_node):
+            q.add(current_node)
+            current_node = None
+
+    return number_of_nodes, pruned, end, new_solutions
+
+
+# Branching scheme of the worker processes of the parallel layer expansion.
+worker_branching_scheme = None
+
+
+def worker_initializer(branching_scheme):
+    global worker_branching_scheme
+    worker_branching_scheme = branching_scheme
+
+
+def worker_expand_layer(arguments):
+    (
+            nodes,
+            solutions,
+            cutoff,
+            maximum_pool_size,
+            queue_size,
+            start,
+            time_limit,
+            maximum_number_of_nodes) = arguments
+    branching_scheme = worker_branching_scheme
+    # The worker uses its own solution pool, dominance history and beam.
+    solution_pool = SolutionPool(branching_scheme, maximum_pool_size)
+    if cutoff is not None:
+        solution_pool.set_cutoff(cutoff)
+    for solution in solutions:
+        if branching_scheme.better(solution, solution_pool.worst):
+            solution_pool.add(solution)
+    history = History(branching_scheme)
+
+    def evict(node):
+        remove_from_history(branching_scheme, history, node)
+
+    q = new_sorted_list(branching_scheme, nodes)
+    q_next = BoundedBeam(
+            queue_size, evict, getattr(branching_scheme, "key", None))
+    termination = Termination(
+            branching_scheme,
+            solution_pool,
+            start,
+            {
+                "time_limit": time_limit,
+                "maximum_number_of_nodes": maximum_number_of_nodes})
+    number_of_nodes, pruned, end, new_solutions = run(expand_layer(
+            branching_scheme,
+            get_next_children(branching_scheme),
+            q,
+            q_next,
+            history,
+            solution_pool,
+            termination,
+            0))
+    return q_next.select(), new_solutions, number_of_nodes, pruned, end
 
 
 def iterative_beam_search(branching_scheme, **parameters):
+    return run(iterative_beam_search_iterator(branching_scheme, **parameters))
+
+
+def iterative_beam_search_iterator(branching_scheme, **parameters):
+    """Iterator version of 'iterative_beam_search'.
+
+    Yield the events of the search (see 'search_event') and return its
+    output.
+
+    """
     # Read parameters.
-    start = time.time()
+    start = time.monotonic()
     maximum_pool_size = parameters.get(
             "maximum_pool_size", 1)
     minimum_size_of_the_queue = parameters.get(
@@ -22,6 +195,10 @@ def iterative_beam_search(branching_scheme, **parameters):
             "growth_factor", 2)
     time_limit = parameters.get(
             "time_limit", float('inf'))
+    number_of_workers = parameters.get(
+            "number_of_workers", 1)
+    deterministic_merge = parameters.get(
+            "deterministic_merge", False)
     verbose = parameters.get(
             "verbose", True)
 
@@ -42,108 +219,219 @@ def iterative_beam_search(branching_scheme, **parameters):
         print(f"Growth factor:              {growth_factor}")
         print(f"Maximum pool size:          {maximum_pool_size}")
         print(f"Time limit:                 {time_limit}")
+        print(f"Number of workers:          {number_of_workers}")
+        if number_of_workers > 1:
+            print(f"Deterministic merge:        {deterministic_merge}")
 
     # Setup structures.
-    solution_pool = SolutionPool(branching_scheme, maximum_pool_size)
-    q = SortedList()
-    q_next = SortedList()
-    history = {}
+    branching_scheme, statistics = setup_statistics(
+            branching_scheme, parameters)
+    solution_pool = parameters.get("solution_pool", None)
+    if solution_pool is None:
+        solution_pool = SolutionPool(branching_scheme, maximum_pool_size)
+    warm_start(branching_scheme, solution_pool, parameters)
+    next_children = get_next_children(branching_scheme)
+    key = getattr(branching_scheme, "key", None)
+    termination = Termination(
+            branching_scheme, solution_pool, start, parameters)
+    termination.statistics = statistics
+    q = new_sorted_list(branching_scheme)
+    if statistics is None:
+        history = History(branching_scheme)
+    else:
+        history = statistics.history(branching_scheme)
+        statistics.queue(q)
+
+    def evict(node):
+        remove_from_history(branching_scheme, history, node)
+
+    checkpoint, state = setup_checkpoint(
+            branching_scheme, "iterative_beam_search", parameters)
+
+    def save_checkpoint():
+        # Checkpoints contain the state of the search at the beginning of
+        # the current layer, serialized before its nodes are expanded.
+        checkpoint.save(
+                {
+                    "algorithm": "iterative_beam_search",
+                    "queue_size": queue_size,
+                    "depth": layer_depth,
+                    "stop": layer_stop,
+                    "number_of_nodes": layer_number_of_nodes},
+                {},
+                {
+                    "solutions": layer_solutions,
+                    "queue": layer})
+
     queue_size = minimum_size_of_the_queue
     number_of_nodes = 0
     # Initial display.
     solution_pool.display_init(verbose)
-    while queue_size <= maximum_size_of_the_queue:
-        # Display.
-        message = f"q {queue_size}"
-        solution_pool.display(message, start, verbose)
-        # Reset structures.
-        # Becomes False as soon as non-dominated nodes are pruned.
-        stop = True
-        # Becomes True if a time or node limit is reached.
-        end = False
-        q.clear()
-
-        # Initialize queue with root node.
-        q.add(branching_scheme.root())
-
-        depth = 1
-        while q:
-            history.clear()
-            q_next.clear()
-
-            current_node = None
-            while current_node is not None or q:
-                # Check time limit.
-                current_time = time.time()
-                if current_time - start > time_limit:
-                    end = True
-                    break
-
-                # Check node limit.
-                if number_of_nodes > maximum_number_of_nodes:
-                    end = True
-                    break
+    if state is not None:
+        # Restore the state of the search from the checkpoint.
+        data, nodes = state
+        queue_size = data["queue_size"]
+        number_of_nodes = data["number_of_nodes"]
+        for solution in nodes["solutions"]:
+            if branching_scheme.better(solution, solution_pool.worst):
+                solution_pool.add(solution)
+    # The workers receive a copy of the branching scheme once, when they are
+    # started.
+    pool = None
+    if number_of_workers > 1:
+        pool = multiprocessing.Pool(
+                number_of_workers,
+                initializer=worker_initializer,
+                initargs=(branching_scheme, ))
 
-                number_of_nodes += 1
+    try:
+        while queue_size <= maximum_size_of_the_queue:
+            # Display.
+            message = f"q {queue_size}"
+            solution_pool.display(message, start, verbose)
+            # Reset structures.
+            # Becomes False as soon as non-dominated nodes are pruned.
+            stop = True
+            # Becomes True if the search must be terminated.
+            end = False
+            q.clear()
+            q_next = BoundedBeam(queue_size, evict, key)
+            if statistics is not None:
+                statistics.queue(q_next)
 
-                # Get the next processed node from the queue.
-                if current_node is None:
-                    current_node = q.pop(0)
-                    # Check bound.
-                    if branching_scheme.bound(
-                            current_node, solution_pool.worst):
-                        current_node = None
-                        continue
+            if state is None:
+                # Initialize queue with root node.
+                q.add(branching_scheme.root())
+                depth = 1
+            else:
+                # Restart from the layer of the checkpoint.
+                q.update(nodes["queue"])
+                depth = data["depth"]
+                stop = data["stop"]
+                state = None
 
-                # Update stop.
-                if len(q_next) == queue_size \
-                        and q_next[-1] < current_node:
-                    stop = False
-                    break
+            while q:
+                history.clear()
+                q_next.clear()
+                layer_number_of_nodes = number_of_nodes
+                if statistics is not None:
+                    statistics.start_layer()
+                if checkpoint is not None:
+                    layer = checkpoint.serialize(q)
+                    layer_solutions = checkpoint.serialize(
+                            solution_pool.solutions)
+                    layer_depth = depth
+                    layer_stop = stop
+                    # Save checkpoint.
+                    if checkpoint.due():
+                        save_checkpoint()
 
-                # Get next child.
-                child = branching_scheme.next_child(current_node)
-                if child is not None:
-                    # Update best solution.
-                    if branching_scheme.better(child, solution_pool.worst):
-                        solution_pool.add(child)
-                    # Add child to the queue.
-                    if (
-                            not branching_scheme.leaf(child)
-                            and not branching_scheme.bound(
-                                child, solution_pool.worst)):
-                        # Update stop.
-                        if len(q_next) >= queue_size:
+                number_of_parts = min(number_of_workers, len(q))
+                if number_of_parts <= 1:
+                    number_of_nodes, pruned, end, _ = yield from expand_layer(
+                            branching_scheme,
+                            next_children,
+                            q,
+                            q_next,
+                            history,
+                            solution_pool,
+                            termination,
+                            number_of_nodes)
+                    if pruned:
+                        stop = False
+                else:
+                    # Partition the layer. Since q is sorted, a round robin
+                    # distribution gives each worker nodes of similar quality.
+                    remaining_number_of_nodes = (
+                            (maximum_number_of_nodes - number_of_nodes)
+                            / number_of_parts)
+                    tasks = [(
+                        q[part::number_of_parts],
+                        list(solution_pool.solutions),
+                        solution_pool.cutoff,
+                        maximum_pool_size,
+                        queue_size,
+                        start,
+                        time_limit,
+                        remaining_number_of_nodes)
+                        for part in range(number_of_parts)]
+                    q.clear()
+                    if deterministic_merge:
+                        results = pool.imap(worker_expand_layer, tasks)
+                    else:
+                        results = pool.imap_unordered(
+                                worker_expand_layer, tasks)
+                    # Merge the partial beams and solution pools.
+                    for (
+                            children,
+                            new_solutions,
+                            n,
+                            pruned,
+                            part_end) in results:
+                        number_of_nodes += n
+                        if pruned:
                             stop = False
-                        # Check if it is worth adding the child to the next
-                        # queue.
-                        if len(q_next) < queue_size or child < q_next[-1]:
-                            # Add child to the queue (and the history).
-                            add_to_history_and_queue(
-                                    branching_scheme, history, q_next, child)
-                            # If the beam is too large, remove the less
-                            # interesting nodes.
-                            if len(q_next) > queue_size:
-                                remove_from_history_and_queue(
+                        if part_end:
+                            end = True
+                        best = solution_pool.best
+                        for solution in new_solutions:
+                            solution_pool.add(solution)
+                        if solution_pool.best is not best:
+                            yield search_event(
+                                    "solution",
+                                    solution_pool,
+                                    start,
+                                    number_of_nodes)
+                        for child in children:
+                            if branching_scheme.bound(
+                                    child, solution_pool.worst):
+                                continue
+                            if q_next.full():
+                                stop = False
+                            child_key = None if key is None else key(child)
+                            if q_next.accepts(child, child_key):
+                                add_to_history_and_queue(
                                         branching_scheme,
                                         history,
                                         q_next,
-                                        -1)
+                                        child,
+                                        child_key)
+                    if termination.stop(number_of_nodes, len(q_next)):
+                        end = True
+                    yield search_event(
+                            "progress",
+                            solution_pool,
+                            start,
+                            number_of_nodes,
+                            queue_size=len(q_next))
 
-                # If current_node still has children, put it back to the queue.
-                if branching_scheme.infertile(current_node):
-                    current_node = None
-                elif len(q) > 0 and q[0] < current_node:
-                    q.add(current_node)
-                    current_node = None
+                # Only keep the best nodes of the next layer.
+                q.clear()
+                q.update(q_next.select())
+                if statistics is not None:
+                    statistics.layer(
+                            queue_size,
+                            depth,
+                            number_of_nodes - layer_number_of_nodes,
+                            len(q))
+                depth += 1
+                if end:
+                    break
 
-            q, q_next = q_next, q
-            depth += 1
+            if stop or end:
+                break
 
-        if stop:
-            break
+            queue_size = math.ceil(growth_factor * queue_size)
+    finally:
+        # Stop the workers, also when the search is interrupted by an
+        # exception or when the iterator is closed.
+        if pool is not None:
+            pool.terminate()
+            pool.join()
 
-        queue_size = math.ceil(growth_factor * queue_size)
+    # Save the state of an interrupted search.
+    if checkpoint is not None and termination.reason is not None:
+        save_checkpoint()
 
     # Final display.
     solution_pool.display_end(start, verbose)
@@ -151,9 +439,14 @@ def iterative_beam_search(branching_scheme, **parameters):
         print(f"Number of nodes:             {number_of_nodes}")
         print(f"Maximum size of the queue:   {queue_size}")
 
-    end = time.time()
+    end = time.monotonic()
 
-    return {"solution_pool": solution_pool,
+    output = {
+            "solution_pool": solution_pool,
             "maximum_size_of_the_queue": queue_size,
             "number_of_nodes": number_of_nodes,
             "elapsed_time": end - start}
+    if statistics is not None:
+        statistics.report(output)
+    yield {"type": "end", **output}
+    return output
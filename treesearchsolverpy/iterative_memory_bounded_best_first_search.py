@@ -0,0 +1,236 @@
+from .commons import SolutionPool, \
+                     Termination, \
+                     History, \
+                     warm_start, \
+                     search_event, \
+                     run, \
+                     get_next_children, \
+                     get_less, \
+                     new_sorted_list, \
+                     add_to_history_and_queue, \
+                     remove_from_history_and_queue
+from .statistics import setup_statistics
+from .checkpoint import setup_checkpoint
+
+import math
+import time
+
+
+def iterative_memory_bounded_best_first_search(
+        branching_scheme, **parameters):
+    return run(iterative_memory_bounded_best_first_search_iterator(
+        branching_scheme, **parameters))
+
+
+def iterative_memory_bounded_best_first_search_iterator(
+        branching_scheme, **parameters):
+    """Iterator version of 'iterative_memory_bounded_best_first_search'.
+
+    Yield the events of the search (see 'search_event') and return its
+    output.
+
+    """
+    # Read parameters.
+    start = time.monotonic()
+    maximum_pool_size = parameters.get(
+            "maximum_pool_size", 1)
+    minimum_size_of_the_queue = parameters.get(
+            "minimum_size_of_the_queue", 1)
+    maximum_size_of_the_queue = parameters.get(
+            "maximum_size_of_the_queue", float('inf'))
+    maximum_number_of_nodes = parameters.get(
+            "maximum_number_of_nodes", float('inf'))
+    growth_factor = parameters.get(
+            "growth_factor", 2)
+    time_limit = parameters.get(
+            "time_limit", float('inf'))
+    verbose = parameters.get(
+            "verbose", True)
+
+    if verbose:
+        print("======================================")
+        print("           TreeSearchSolver           ")
+        print("======================================")
+        print()
+        print("Algorithm")
+        print("---------")
+        print("Iterative memory bounded best first search")
+        print()
+        print("Parameters")
+        print("----------")
+        print(f"Minimum size of the queue:  {minimum_size_of_the_queue}")
+        print(f"Maximum size of the queue:  {maximum_size_of_the_queue}")
+        print(f"Maximum number of nodes:    {maximum_number_of_nodes}")
+        print(f"Growth factor:              {growth_factor}")
+        print(f"Maximum pool size:          {maximum_pool_size}")
+        print(f"Time limit:                 {time_limit}")
+
+    # Setup structures.
+    branching_scheme, statistics = setup_statistics(
+            branching_scheme, parameters)
+    solution_pool = parameters.get("solution_pool", None)
+    if solution_pool is None:
+        solution_pool = SolutionPool(branching_scheme, maximum_pool_size)
+    warm_start(branching_scheme, solution_pool, parameters)
+    next_children = get_next_children(branching_scheme)
+    less = get_less(branching_scheme)
+    termination = Termination(
+            branching_scheme, solution_pool, start, parameters)
+    termination.statistics = statistics
+    queue = new_sorted_list(branching_scheme)
+    if statistics is None:
+        history = History(branching_scheme)
+    else:
+        history = statistics.history(branching_scheme)
+        statistics.queue(queue)
+    checkpoint, state = setup_checkpoint(
+            branching_scheme,
+            "iterative_memory_bounded_best_first_search",
+            parameters)
+    queue_size = minimum_size_of_the_queue
+    number_of_nodes = 0
+
+    def save_checkpoint():
+        nodes = list(queue)
+        if current_node is not None:
+            nodes.append(current_node)
+        checkpoint.save(
+                {
+                    "algorithm": "iterative_memory_bounded_best_first_search",
+                    "queue_size": queue_size,
+                    "stop": stop,
+                    "number_of_nodes": number_of_nodes},
+                {
+                    "solutions": list(solution_pool.solutions),
+                    "queue": nodes})
+
+    # Initial display.
+    solution_pool.display_init(verbose)
+    if state is not None:
+        # Restore the state of the search from the checkpoint.
+        data, nodes = state
+        queue_size = data["queue_size"]
+        number_of_nodes = data["number_of_nodes"]
+        for solution in nodes["solutions"]:
+            if branching_scheme.better(solution, solution_pool.worst):
+                solution_pool.add(solution)
+    while queue_size <= maximum_size_of_the_queue:
+        # Display.
+        message = f"q {queue_size}"
+        solution_pool.display(message, start, verbose)
+        # Reset structures.
+        # Becomes False as soon as non-dominated nodes are pruned.
+        stop = True
+        # Becomes True if the search must be terminated.
+        end = False
+        queue.clear()
+        history.clear()
+
+        if state is None:
+            # Initialize queue with root node.
+            root = branching_scheme.root()
+            add_to_history_and_queue(branching_scheme, history, queue, root)
+        else:
+            # Restart from the queue of the checkpoint.
+            for node in nodes["queue"]:
+                add_to_history_and_queue(
+                        branching_scheme, history, queue, node)
+            stop = data["stop"]
+            state = None
+        current_node = None
+
+        while current_node is not None or queue:
+
+            # Check termination.
+            if number_of_nodes >= termination.next_check:
+                if termination.stop(number_of_nodes, len(queue)):
+                    end = True
+                    break
+                # Save checkpoint.
+                if checkpoint is not None and checkpoint.due():
+                    save_checkpoint()
+                yield search_event(
+                        "progress",
+                        solution_pool,
+                        start,
+                        number_of_nodes,
+                        queue_size=len(queue))
+
+            number_of_nodes += 1
+
+            # Get the next processed node from the queue.
+            if current_node is None:
+                current_node = queue[0]
+                remove_from_history_and_queue(
+                        branching_scheme, history, queue, 0)
+                # Check bound.
+                if branching_scheme.bound(
+                        current_node, solution_pool.worst):
+                    current_node = None
+                    continue
+
+            # Get next children.
+            for child in next_children(current_node):
+                # Update best solution.
+                if branching_scheme.better(child, solution_pool.worst):
+                    display = branching_scheme.better(
+                            child, solution_pool.best)
+                    solution_pool.add(child)
+                    # Display.
+                    if display:
+                        message = f"node {number_of_nodes}"
+                        solution_pool.display(message, start, verbose)
+                        yield search_event(
+                                "solution",
+                                solution_pool,
+                                start,
+                                number_of_nodes)
+                # Add child to the queue.
+                if (
+                        not branching_scheme.leaf(child)
+                        and not branching_scheme.bound(
+                            child, solution_pool.worst)):
+                    # Add child to the queue (and the history).
+                    add_to_history_and_queue(
+                            branching_scheme, history, queue, child)
+
+            # If current_node still has children, put it back to the queue.
+            if branching_scheme.infertile(current_node):
+                current_node = None
+            elif len(queue) > 0 and less(queue[0], current_node):
+                add_to_history_and_queue(
+                        branching_scheme, history, queue, current_node)
+                current_node = None
+
+            # If the queue is too large, remove the less interesting nodes.
+            while len(queue) > queue_size:
+                remove_from_history_and_queue(
+                        branching_scheme, history, queue, -1)
+                stop = False
+
+        if stop or end:
+            break
+
+        queue_size = math.ceil(growth_factor * queue_size)
+
+    # Save the state of an interrupted search.
+    if checkpoint is not None and termination.reason is not None:
+        save_checkpoint()
+
+    # Final display.
+    solution_pool.display_end(start, verbose)
+    if verbose:
+        print(f"Number of nodes:             {number_of_nodes}")
+        print(f"Maximum size of the queue:   {queue_size}")
+
+    end = time.monotonic()
+
+    output = {
+            "solution_pool": solution_pool,
+            "maximum_size_of_the_queue": queue_size,
+            "number_of_nodes": number_of_nodes,
+            "elapsed_time": end - start}
+    if statistics is not None:
+        statistics.report(output)
+    yield {"type": "end", **output}
+    return output
@@ -0,0 +1,55 @@
+from .greedy import greedy_iterator
+from .best_first_search import best_first_search_iterator
+from .parallel_best_first_search import \
+        parallel_best_first_search_iterator
+from .iterative_beam_search import iterative_beam_search_iterator
+from .iterative_memory_bounded_best_first_search import \
+        iterative_memory_bounded_best_first_search_iterator
+from .anytime_column_search import anytime_column_search_iterator
+from .grasp import grasp_iterator
+
+import asyncio
+
+
+ITERATORS = {
+        "greedy": greedy_iterator,
+        "best_first_search": best_first_search_iterator,
+        "parallel_best_first_search":
+        parallel_best_first_search_iterator,
+        "iterative_beam_search": iterative_beam_search_iterator,
+        "iterative_memory_bounded_best_first_search":
+        iterative_memory_bounded_best_first_search_iterator,
+        "anytime_column_search": anytime_column_search_iterator,
+        "grasp": grasp_iterator,
+        }
+
+
+def iterate(algorithm, branching_scheme, **parameters):
+    """Return an iterator over the events of a search.
+
+    Events are dictionaries (see 'commons.search_event') yielded when a new
+    best solution is found and at each termination check, that is about
+    every 'check_period' seconds. The last event has type 'end' and contains
+    the output of the algorithm. Closing the iterator stops the search.
+
+    """
+    if algorithm not in ITERATORS:
+        raise ValueError(f"Unknown algorithm: '{algorithm}'.")
+    return ITERATORS[algorithm](branching_scheme, **parameters)
+
+
+async def aiterate(algorithm, branching_scheme, **parameters):
+    """Asynchronous version of 'iterate'.
+
+    The search runs in the thread of the event loop, which gets back the
+    control after each event. Cancelling the task consuming the iterator, or
+    closing the iterator, stops the search.
+
+    """
+    events = iterate(algorithm, branching_scheme, **parameters)
+    try:
+        for event in events:
+            yield event
+            await asyncio.sleep(0)
+    finally:
+        events.close()
@@ -0,0 +1,487 @@
+from .commons import SolutionPool, \
+                     Termination, \
+                     History, \
+                     warm_start, \
+                     search_event, \
+                     run, \
+                     get_next_children, \
+                     get_less, \
+                     new_sorted_list, \
+                     add_to_history_and_queue, \
+                     remove_from_history_and_queue
+from .portfolio import SharedSolutionPool, \
+                       get_result
+
+import os
+import time
+import queue
+import pickle
+import traceback
+import multiprocessing
+
+
+def serialize_nodes(branching_scheme, nodes):
+    serialize_node = getattr(branching_scheme, "serialize_node", None)
+    if serialize_node is None:
+        return nodes
+    return [serialize_node(node) for node in nodes]
+
+
+def deserialize_nodes(branching_scheme, data):
+    deserialize_node = getattr(branching_scheme, "deserialize_node", None)
+    if deserialize_node is None:
+        return data
+    return [deserialize_node(d) for d in data]
+
+
+class SharedState:
+    """Communication structures of the parallel best first search.
+
+    Each worker owns an inbox receiving messages (type, data):
+    * ("nodes", nodes): nodes whose bucket is owned by the worker
+    * ("stolen", nodes): nodes sent in reply to a steal request
+    * ("steal", worker_id): steal request of an idle worker
+    * ("refused", None): reply to a steal request when the victim doesn't
+      have enough nodes
+
+    "nodes" and "stolen" messages carry work. 'sent[i]' and 'received[i]'
+    count the work messages sent and received by worker i, and 'idle[i]' is
+    set when worker i has nothing left to expand. A worker clears its idle
+    flag before counting a received message, and counts the messages it
+    sends before setting it. Therefore, if two successive snapshots of the
+    flags and counters are equal, show all the workers idle and as many
+    messages sent as received, no work is left anywhere.
+
+    """
+
+    def __init__(self, number_of_workers):
+        self.node_inboxes = [
+                multiprocessing.Queue() for _ in range(number_of_workers)]
+        # The main process owns the last solution inbox.
+        self.solution_inboxes = [
+                multiprocessing.Queue() for _ in range(number_of_workers + 1)]
+        self.pending = multiprocessing.RawArray('l', number_of_workers + 1)
+        self.lock = multiprocessing.Lock()
+        self.stop_event = multiprocessing.Event()
+        self.idle = multiprocessing.RawArray('b', number_of_workers)
+        self.sent = multiprocessing.RawArray('q', number_of_workers)
+        self.received = multiprocessing.RawArray('q', number_of_workers)
+        self.number_of_nodes = multiprocessing.RawArray('q', number_of_workers)
+        self.results = multiprocessing.Queue()
+
+    def snapshot(self):
+        return (
+                all(self.idle),
+                sum(self.sent),
+                sum(self.received))
+
+
+def parallel_best_first_search_worker(
+        branching_scheme, worker_id, state, start, parameters):
+    try:
+        solution_pool, output = expand(
+                branching_scheme, worker_id, state, start, parameters)
+    except Exception:
+        # Report the error to the main process and stop the other workers.
+        state.results.put((worker_id, None, traceback.format_exc()))
+        state.stop_event.set()
+        raise
+    finally:
+        # The messages still in the inboxes are not needed anymore, don't
+        # wait for them to be flushed before exiting.
+        for inbox in state.node_inboxes + state.solution_inboxes:
+            inbox.cancel_join_thread()
+    state.results.put((
+        worker_id,
+        serialize_nodes(branching_scheme, list(solution_pool.solutions)),
+        output))
+
+
+def expand(branching_scheme, worker_id, state, start, parameters):
+    # Read parameters.
+    number_of_workers = len(state.node_inboxes)
+    maximum_pool_size = parameters.get(
+            "maximum_pool_size", 1)
+    batch_size = parameters.get(
+            "batch_size", 64)
+    steal_size = parameters.get(
+            "steal_size", 16)
+    check_period = parameters.get(
+            "check_period", 0.01)
+
+    # Setup structures.
+    solution_pool = SharedSolutionPool(
+            branching_scheme,
+            maximum_pool_size,
+            worker_id,
+            state.solution_inboxes,
+            state.pending,
+            state.lock)
+    warm_start(branching_scheme, solution_pool, parameters)
+    next_children = get_next_children(branching_scheme)
+    less = get_less(branching_scheme)
+    termination = Termination(
+            branching_scheme,
+            solution_pool,
+            start,
+            {
+                "time_limit": parameters.get("time_limit", float('inf')),
+                "memory_limit": parameters.get("memory_limit", float('inf')),
+                "cancel_event": state.stop_event,
+                "check_period": check_period})
+    q = new_sorted_list(branching_scheme)
+    history = History(branching_scheme)
+    inbox = state.node_inboxes[worker_id]
+    # Nodes waiting to be sent to each worker.
+    outgoing = [[] for _ in range(number_of_workers)]
+    number_of_nodes = 0
+    maximum_size_of_the_queue = 0
+    number_of_stolen_nodes = 0
+    steal_pending = False
+    # Number of consecutive refused steal requests. After a refusal by each
+    # other worker, the worker waits for 'check_period' before asking
+    # again.
+    number_of_refusals = 0
+    victim = worker_id
+    current_node = None
+
+    def send(owner, message_type, nodes):
+        state.sent[worker_id] += 1
+        state.node_inboxes[owner].put(
+                (message_type, serialize_nodes(branching_scheme, nodes)))
+
+    def flush():
+        for owner, nodes in enumerate(outgoing):
+            if nodes:
+                send(owner, "nodes", nodes)
+                outgoing[owner] = []
+
+    def receive(message):
+        nonlocal steal_pending, number_of_refusals, number_of_stolen_nodes
+        message_type, data = message
+        if message_type == "steal":
+            # Give the best nodes of the queue, but keep at least half of
+            # them.
+            size = min(steal_size, len(q) // 2)
+            if size == 0:
+                state.node_inboxes[data].put(("refused", None))
+                return
+            nodes = list(q[:size])
+            for _ in range(size):
+                remove_from_history_and_queue(branching_scheme, history, q, 0)
+            send(data, "stolen", nodes)
+            return
+        if message_type == "refused":
+            steal_pending = False
+            number_of_refusals += 1
+            return
+        state.idle[worker_id] = 0
+        number_of_refusals = 0
+        nodes = deserialize_nodes(branching_scheme, data)
+        if message_type == "stolen":
+            steal_pending = False
+            number_of_stolen_nodes += len(nodes)
+            # Stolen nodes belong to the buckets of another worker, they are
+            # not added to the history.
+            for node in nodes:
+                q.add(node)
+        else:
+            for node in nodes:
+                if not branching_scheme.bound(node, solution_pool.worst):
+                    add_to_history_and_queue(
+                            branching_scheme, history, q, node)
+        state.received[worker_id] += 1
+
+    def read_messages():
+        while True:
+            try:
+                message = inbox.get_nowait()
+            except queue.Empty:
+                return
+            receive(message)
+
+    if worker_id == 0:
+        # Initialize queue with root node.
+        root = branching_scheme.root()
+        add_to_history_and_queue(branching_scheme, history, q, root)
+
+    while True:
+
+        # Check termination and exchange nodes.
+        if number_of_nodes >= termination.next_check:
+            if termination.stop(number_of_nodes, len(q)):
+                break
+            flush()
+            state.number_of_nodes[worker_id] = number_of_nodes
+            read_messages()
+
+        # If there is no node left, ask another worker for some.
+        if current_node is None and not q:
+            flush()
+            state.number_of_nodes[worker_id] = number_of_nodes
+            if (
+                    not steal_pending
+                    and number_of_refusals < number_of_workers - 1):
+                victim = (victim + 1) % number_of_workers
+                if victim == worker_id:
+                    victim = (victim + 1) % number_of_workers
+                state.node_inboxes[victim].put(("steal", worker_id))
+                steal_pending = True
+            state.idle[worker_id] = 1
+            try:
+                message = inbox.get(timeout=check_period)
+            except queue.Empty:
+                if state.stop_event.is_set():
+                    break
+                number_of_refusals = 0
+                continue
+            receive(message)
+            continue
+
+        # Update statistics.
+        number_of_nodes += 1
+        maximum_size_of_the_queue = max(maximum_size_of_the_queue, len(q))
+
+        # Get the next processed node from the queue.
+        if current_node is None:
+            current_node = q[0]
+            remove_from_history_and_queue(branching_scheme, history, q, 0)
+            # Check bound.
+            if branching_scheme.bound(
+                    current_node, solution_pool.worst):
+                current_node = None
+                continue
+
+        # Get next children.
+        for child in next_children(current_node):
+            # Update best solution.
+            if branching_scheme.better(child, solution_pool.worst):
+                solution_pool.add(child)
+            # Add child to the queue of the worker owning its bucket.
+            if (
+                    not branching_scheme.leaf(child)
+                    and not branching_scheme.bound(
+                        child, solution_pool.worst)):
+                owner = worker_id
+                if branching_scheme.comparable(child):
+                    owner = (
+                            hash(branching_scheme.Bucket(child))
+                            % number_of_workers)
+                if owner == worker_id:
+                    add_to_history_and_queue(
+                            branching_scheme, history, q, child)
+                else:
+                    outgoing[owner].append(child)
+                    if len(outgoing[owner]) >= batch_size:
+                        send(owner, "nodes", outgoing[owner])
+                        outgoing[owner] = []
+
+        # If current_node still has children, put it back to the queue.
+        if branching_scheme.infertile(current_node):
+            current_node = None
+        elif len(q) > 0 and less(q[0], current_node):
+            q.add(current_node)
+            current_node = None
+
+    state.number_of_nodes[worker_id] = number_of_nodes
+    return solution_pool, {
+            "number_of_nodes": number_of_nodes,
+            "maximum_size_of_the_queue": maximum_size_of_the_queue,
+            "number_of_stolen_nodes": number_of_stolen_nodes}
+
+
+def parallel_best_first_search(branching_scheme, **parameters):
+    return run(parallel_best_first_search_iterator(
+        branching_scheme, **parameters))
+
+
+def parallel_best_first_search_iterator(branching_scheme, **parameters):
+    """Iterator version of 'parallel_best_first_search'.
+
+    Yield the events of the search (see 'search_event') and return its
+    output.
+
+    """
+    # Read parameters.
+    start = time.monotonic()
+    maximum_pool_size = parameters.get(
+            "maximum_pool_size", 1)
+    number_of_workers = parameters.get(
+            "number_of_workers", os.cpu_count())
+    batch_size = parameters.get(
+            "batch_size", 64)
+    steal_size = parameters.get(
+            "steal_size", 16)
+    maximum_number_of_nodes = parameters.get(
+            "maximum_number_of_nodes", float('inf'))
+    time_limit = parameters.get(
+            "time_limit", float('inf'))
+    check_period = parameters.get(
+            "check_period", 0.01)
+    verbose = parameters.get(
+            "verbose", True)
+
+    if verbose:
+        print("======================================")
+        print("           TreeSearchSolver           ")
+        print("======================================")
+        print()
+        print("Algorithm")
+        print("---------")
+        print("Parallel best first search")
+        print()
+        print("Parameters")
+        print("----------")
+        print(f"Number of workers:          {number_of_workers}")
+        print(f"Batch size:                 {batch_size}")
+        print(f"Steal size:                 {steal_size}")
+        print(f"Maximum number of nodes:    {maximum_number_of_nodes}")
+        print(f"Maximum pool size:          {maximum_pool_size}")
+        print(f"Time limit:                 {time_limit}")
+
+    # Setup structures.
+    state = SharedState(number_of_workers)
+    solution_pool = SharedSolutionPool(
+            branching_scheme,
+            maximum_pool_size,
+            number_of_workers,
+            state.solution_inboxes,
+            state.pending,
+            state.lock)
+    warm_start(branching_scheme, solution_pool, parameters)
+    termination = Termination(
+            branching_scheme, solution_pool, start, parameters)
+    # The parameters sent to the workers.
+    worker_parameters = {
+            key: value
+            for key, value in parameters.items()
+            if key in (
+                "maximum_pool_size",
+                "batch_size",
+                "steal_size",
+                "check_period",
+                "time_limit",
+                "memory_limit",
+                "cutoff",
+                "initial_solutions",
+                "initial_certificates")}
+
+    # Nodes are sent between processes. Check that they can be pickled,
+    # since an error in the feeder thread of a queue would only be printed
+    # by the process sending them.
+    pickle.dumps(serialize_nodes(branching_scheme, [branching_scheme.root()]))
+
+    # Initial display.
+    solution_pool.display_init(verbose)
+
+    # Start workers.
+    processes = []
+    for worker_id in range(number_of_workers):
+        process = multiprocessing.Process(
+                target=parallel_best_first_search_worker,
+                args=(
+                    branching_scheme,
+                    worker_id,
+                    state,
+                    start,
+                    worker_parameters))
+        process.start()
+        processes.append(process)
+
+    outputs = [None] * number_of_workers
+    received = [False] * number_of_workers
+    number_of_results = 0
+
+    def collect(timeout):
+        # Return False if no result has been received within 'timeout'
+        # seconds (never if it is None). A worker which failed or exited
+        # without sending its result raises a RuntimeError.
+        nonlocal number_of_results
+        result = get_result(state.results, processes, received, timeout)
+        if result is None:
+            return False
+        worker_id, solutions, output = result
+        if solutions is None:
+            raise RuntimeError(
+                    f"Parallel best first search worker {worker_id} "
+                    f"failed:\n{output}")
+        received[worker_id] = True
+        outputs[worker_id] = output
+        number_of_results += 1
+        for solution in deserialize_nodes(branching_scheme, solutions):
+            if branching_scheme.better(solution, solution_pool.worst):
+                SolutionPool.add(solution_pool, solution)
+        return True
+
+    try:
+        snapshot = None
+        while True:
+            time.sleep(check_period)
+            while collect(0):
+                pass
+
+            # Import the solutions found by the workers.
+            best = solution_pool.best
+            solution_pool.synchronize()
+            number_of_nodes = sum(state.number_of_nodes)
+            if solution_pool.best is not best:
+                message = f"node {number_of_nodes}"
+                solution_pool.display(message, start, verbose)
+                yield search_event(
+                        "solution",
+                        solution_pool,
+                        start,
+                        number_of_nodes)
+
+            # Check termination.
+            if termination.stop(number_of_nodes):
+                break
+            # Check if the search is complete.
+            previous_snapshot = snapshot
+            snapshot = state.snapshot()
+            if snapshot == previous_snapshot \
+                    and snapshot[0] \
+                    and snapshot[1] == snapshot[2]:
+                break
+            if number_of_results == number_of_workers:
+                break
+            yield search_event(
+                    "progress",
+                    solution_pool,
+                    start,
+                    number_of_nodes)
+
+        # Stop the workers and merge their solution pools.
+        state.stop_event.set()
+        while number_of_results < number_of_workers:
+            collect(None)
+        for process in processes:
+            process.join()
+    finally:
+        state.stop_event.set()
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for inbox in state.solution_inboxes:
+            inbox.cancel_join_thread()
+
+    number_of_nodes = sum(output["number_of_nodes"] for output in outputs)
+    number_of_stolen_nodes = sum(
+            output["number_of_stolen_nodes"] for output in outputs)
+
+    # Final display.
+    solution_pool.display_end(start, verbose)
+    if verbose:
+        print(f"Number of nodes:             {number_of_nodes}")
+        print(f"Number of stolen nodes:      {number_of_stolen_nodes}")
+
+    end = time.monotonic()
+
+    output = {
+            "solution_pool": solution_pool,
+            "outputs": outputs,
+            "number_of_stolen_nodes": number_of_stolen_nodes,
+            "number_of_nodes": number_of_nodes,
+            "elapsed_time": end - start}
+    yield {"type": "end", **output}
+    return output
@@ -0,0 +1,266 @@
+from .commons import SolutionPool
+from .greedy import greedy
+from .best_first_search import best_first_search
+from .iterative_beam_search import iterative_beam_search
+from .iterative_memory_bounded_best_first_search import \
+        iterative_memory_bounded_best_first_search
+from .anytime_column_search import anytime_column_search
+from .grasp import grasp
+
+import time
+import queue
+import traceback
+import multiprocessing
+
+
+ALGORITHMS = {
+        "greedy": greedy,
+        "best_first_search": best_first_search,
+        "iterative_beam_search": iterative_beam_search,
+        "iterative_memory_bounded_best_first_search":
+        iterative_memory_bounded_best_first_search,
+        "anytime_column_search": anytime_column_search,
+        "grasp": grasp,
+        }
+
+
+class SharedSolutionPool(SolutionPool):
+    """Solution pool sharing its new best solutions with other processes.
+
+    Each worker owns an inbox. When a worker finds a new best solution, it
+    sends it to the inboxes of all the other workers and increments their
+    number of pending messages. 'synchronize' is called by the algorithms
+    and only reads the inbox when messages are pending.
+
+    """
+
+    def __init__(
+            self,
+            branching_scheme,
+            maximum_size,
+            worker_id,
+            inboxes,
+            pending,
+            lock):
+        super().__init__(branching_scheme, maximum_size)
+        self.worker_id = worker_id
+        self.inboxes = inboxes
+        self.pending = pending
+        self.lock = lock
+        self.number_of_received_solutions = 0
+
+    def add(self, node):
+        best = self.best
+        if not super().add(node):
+            return False
+        # Broadcast new best solutions.
+        if self.best is not best:
+            with self.lock:
+                for worker_id, inbox in enumerate(self.inboxes):
+                    if worker_id != self.worker_id:
+                        inbox.put(node)
+                        self.pending[worker_id] += 1
+        return True
+
+    def synchronize(self):
+        if self.pending[self.worker_id] == self.number_of_received_solutions:
+            return
+        inbox = self.inboxes[self.worker_id]
+        while True:
+            try:
+                node = inbox.get_nowait()
+            except queue.Empty:
+                break
+            self.number_of_received_solutions += 1
+            # Don't broadcast the solutions received.
+            SolutionPool.add(self, node)
+
+
+def get_result(results, processes, received, timeout=None):
+    """Return the next result sent by the worker processes to the queue
+    'results', or None if no result is received within 'timeout' seconds
+    (never if it is None).
+
+    'received[i]' is True if the result of worker i has already been
+    received. If a worker exited without sending its result, for example
+    because it has been killed or because its result couldn't be pickled, a
+    RuntimeError is raised instead of waiting for it forever.
+
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        # A worker sends its result before exiting, so if a worker had
+        # already exited before the queue is found empty, it never sent it.
+        exited = [
+                worker_id
+                for worker_id, process in enumerate(processes)
+                if not received[worker_id] and process.exitcode is not None]
+        wait = 0.1
+        if deadline is not None:
+            wait = min(wait, max(0, deadline - time.monotonic()))
+        try:
+            return results.get(True, wait)
+        except queue.Empty:
+            pass
+        if exited:
+            worker_id = exited[0]
+            raise RuntimeError(
+                    f"Worker {worker_id} exited with code "
+                    f"{processes[worker_id].exitcode} without sending its "
+                    f"result.")
+        if deadline is not None and time.monotonic() >= deadline:
+            return None
+
+
+def portfolio_worker(
+        branching_scheme_factory,
+        algorithm,
+        algorithm_parameters,
+        worker_id,
+        inboxes,
+        pending,
+        lock,
+        results):
+    try:
+        branching_scheme = branching_scheme_factory()
+        solution_pool = SharedSolutionPool(
+                branching_scheme,
+                algorithm_parameters.get("maximum_pool_size", 1),
+                worker_id,
+                inboxes,
+                pending,
+                lock)
+        output = ALGORITHMS[algorithm](
+                branching_scheme,
+                **{
+                    **algorithm_parameters,
+                    "solution_pool": solution_pool,
+                    "verbose": False})
+    except Exception:
+        # Report the error to the main process instead of leaving it waiting
+        # for the results.
+        results.put((worker_id, None, traceback.format_exc()))
+        raise
+    finally:
+        # The solutions still in the inboxes are not needed anymore, don't
+        # wait for them to be flushed before exiting.
+        for inbox in inboxes:
+            inbox.cancel_join_thread()
+    results.put((
+        worker_id,
+        list(solution_pool.solutions),
+        {key: value
+         for key, value in output.items()
+         if key != "solution_pool"}))
+
+
+def portfolio(branching_scheme_factory, algorithms=None, **parameters):
+    """Run several algorithms in parallel worker processes.
+
+    'branching_scheme_factory' is a picklable callable without arguments
+    returning a branching scheme; it is called once in each worker.
+    'algorithms' is a list of algorithm names or of pairs (algorithm name,
+    dictionary of parameters). The other parameters are passed to all the
+    algorithms.
+
+    """
+    # Read parameters.
+    start = time.monotonic()
+    if algorithms is None:
+        algorithms = [
+                "greedy",
+                "best_first_search",
+                "iterative_beam_search"]
+    maximum_pool_size = parameters.get(
+            "maximum_pool_size", 1)
+    verbose = parameters.get(
+            "verbose", True)
+
+    configurations = []
+    for algorithm in algorithms:
+        if isinstance(algorithm, str):
+            algorithm, algorithm_parameters = algorithm, {}
+        else:
+            algorithm, algorithm_parameters = algorithm
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Unknown algorithm: '{algorithm}'.")
+        configurations.append(
+                (algorithm, {**parameters, **algorithm_parameters}))
+
+    if verbose:
+        print("======================================")
+        print("           TreeSearchSolver           ")
+        print("======================================")
+        print()
+        print("Algorithm")
+        print("---------")
+        print("Portfolio")
+        print()
+        print("Parameters")
+        print("----------")
+        print(f"Maximum pool size:          {maximum_pool_size}")
+        for algorithm, algorithm_parameters in configurations:
+            print(f"Algorithm:                  {algorithm}")
+
+    # Start workers.
+    number_of_workers = len(configurations)
+    inboxes = [multiprocessing.Queue() for _ in range(number_of_workers)]
+    pending = multiprocessing.RawArray('l', number_of_workers)
+    lock = multiprocessing.Lock()
+    results = multiprocessing.Queue()
+    processes = []
+    for worker_id, (algorithm, algorithm_parameters) in enumerate(
+            configurations):
+        process = multiprocessing.Process(
+                target=portfolio_worker,
+                args=(
+                    branching_scheme_factory,
+                    algorithm,
+                    algorithm_parameters,
+                    worker_id,
+                    inboxes,
+                    pending,
+                    lock,
+                    results))
+        process.start()
+        processes.append(process)
+
+    # Merge the solution pools of the workers.
+    branching_scheme = branching_scheme_factory()
+    solution_pool = SolutionPool(branching_scheme, maximum_pool_size)
+    solution_pool.display_init(verbose)
+    outputs = [None] * number_of_workers
+    received = [False] * number_of_workers
+    try:
+        for _ in range(number_of_workers):
+            worker_id, solutions, output = get_result(
+                    results, processes, received)
+            if solutions is None:
+                raise RuntimeError(
+                        f"Portfolio worker {worker_id} failed:\n{output}")
+            received[worker_id] = True
+            outputs[worker_id] = output
+            for solution in solutions:
+                if branching_scheme.better(solution, solution_pool.worst):
+                    solution_pool.add(solution)
+            algorithm = configurations[worker_id][0]
+            solution_pool.display(algorithm, start, verbose)
+        for process in processes:
+            process.join()
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+    number_of_nodes = sum(output["number_of_nodes"] for output in outputs)
+
+    # Final display.
+    solution_pool.display_end(start, verbose)
+    if verbose:
+        print(f"Number of nodes:             {number_of_nodes}")
+
+    end = time.monotonic()
+
+    return {"solution_pool": solution_pool,
+            "outputs": outputs,
+            "number_of_nodes": number_of_nodes,
+            "elapsed_time": end - start}
@@ -0,0 +1,258 @@
+from .commons import History
+
+import time
+import types
+
+
+CALLBACKS = [
+        "root",
+        "next_child",
+        "next_children",
+        "infertile",
+        "leaf",
+        "bound",
+        "better",
+        "key",
+        "equals",
+        "comparable",
+        "dominates",
+        "dominance_key",
+        "solution_hash",
+        "goal_node",
+        "display",
+        "to_solution",
+        ]
+
+# Timed methods of the queues and beams.
+QUEUE_OPERATIONS = [
+        "add",
+        "update",
+        "pop",
+        "remove",
+        "accepts",
+        "select",
+        ]
+
+
+def timed(entry, function):
+    # entry is a list [number of calls, total time]. A generator returned
+    # by the function is consumed in the timed region, so that the time spent
+    # generating its elements is counted.
+    def wrapper(*args):
+        start = time.perf_counter()
+        result = function(*args)
+        if type(result) is types.GeneratorType:
+            result = tuple(result)
+        entry[1] += time.perf_counter() - start
+        entry[0] += 1
+        return result
+    return wrapper
+
+
+def unwrap(branching_scheme):
+    return branching_scheme
+
+
+class InstrumentedBranchingScheme:
+    """Branching scheme counting and timing the calls to the methods of
+    another branching scheme.
+
+    Only the methods defined by the wrapped branching scheme are exposed, so
+    that the algorithms detect the same optional methods. The construction
+    of buckets and their '__hash__' and '__eq__' methods are timed as well.
+    Other attributes are read from the wrapped branching scheme.
+
+    When it is sent to another process, the wrapped branching scheme is sent
+    instead; calls made in other processes are not counted.
+
+    """
+
+    def __init__(self, branching_scheme, callbacks=None):
+        self.branching_scheme = branching_scheme
+        self.callbacks = {} if callbacks is None else callbacks
+        for name in CALLBACKS:
+            function = getattr(branching_scheme, name, None)
+            if function is not None:
+                entry = self.callbacks.setdefault(name, [0, 0.0])
+                setattr(self, name, timed(entry, function))
+
+        hash_entry = self.callbacks.setdefault("Bucket.__hash__", [0, 0.0])
+        eq_entry = self.callbacks.setdefault("Bucket.__eq__", [0, 0.0])
+        base = branching_scheme.Bucket
+
+        class Bucket(base):
+            __hash__ = timed(hash_entry, base.__hash__)
+            __eq__ = timed(eq_entry, base.__eq__)
+
+        entry = self.callbacks.setdefault("Bucket", [0, 0.0])
+        self.Bucket = timed(entry, Bucket)
+
+    def __getattr__(self, name):
+        return getattr(self.branching_scheme, name)
+
+    def __reduce__(self):
+        return (unwrap, (self.branching_scheme, ))
+
+
+class InstrumentedHistory(History):
+    """Dominance history counting the insertions, the dominated nodes and the
+    removals, and timing them."""
+
+    def __init__(self, branching_scheme):
+        super().__init__(branching_scheme)
+        self.number_of_insertions = 0
+        self.number_of_dominated_nodes = 0
+        self.number_of_removed_dominated_nodes = 0
+        self.number_of_removals = 0
+        self.time = 0.0
+
+    def add(self, node, queue):
+        start = time.perf_counter()
+        size = self.number_of_nodes
+        added = super().add(node, queue)
+        self.time += time.perf_counter() - start
+        self.number_of_insertions += 1
+        if added:
+            self.number_of_removed_dominated_nodes += (
+                    size + 1 - self.number_of_nodes)
+        else:
+            self.number_of_dominated_nodes += 1
+        return added
+
+    def remove(self, node):
+        start = time.perf_counter()
+        size = self.number_of_nodes
+        super().remove(node)
+        self.time += time.perf_counter() - start
+        self.number_of_removals += size - self.number_of_nodes
+
+
+class Statistics:
+    """Statistics of a search, collected when the 'statistics' parameter of
+    an algorithm is set.
+
+    The parameter is either True, or a callable (the sink) which is called
+    with the statistics at the end of the search. In both cases, the
+    statistics are added to the output of the algorithm with the key
+    'statistics'. They contain:
+    * callbacks: number of calls and total time of each method of the
+      branching scheme; when a method returns a generator, for example
+      'next_children', the generator is consumed in the timed region
+    * queue: number of calls and total time of the operations on the
+      queues and beams of the algorithm; the time of the selections
+      triggered by 'add' in a beam is counted in both 'add' and 'select'
+    * history: number of insertions in the dominance history, of dominated
+      nodes, of nodes removed because they were dominated, of other removals,
+      and the total time spent in the history (including the calls to the
+      branching scheme and the removals from the queue)
+    * samples: time, number of nodes, size of the queue and size of the
+      history, taken at each termination check
+    * layers: for the iterative beam search, the size of the queue, the
+      depth, the number of nodes of the layer, the number of nodes kept for
+      the next layer, the time at which the layer ended since the start of
+      the search and the duration of the layer
+
+    When the parameter is not set, the algorithms use the branching scheme
+    and the history directly.
+
+    """
+
+    def __init__(self, sink=None):
+        self.sink = sink
+        self.start = time.monotonic()
+        self.callbacks = {}
+        self.queue_operations = {}
+        self.histories = []
+        self.samples = []
+        self.layers = []
+        self.layer_start = self.start
+
+    def instrument(self, branching_scheme):
+        """Return the instrumented branching scheme."""
+        return InstrumentedBranchingScheme(branching_scheme, self.callbacks)
+
+    def history(self, branching_scheme):
+        """Return a new instrumented dominance history."""
+        history = InstrumentedHistory(branching_scheme)
+        self.histories.append(history)
+        return history
+
+    def queue(self, queue):
+        """Time the operations of a queue and return it."""
+        for name in QUEUE_OPERATIONS:
+            function = getattr(queue, name, None)
+            if function is not None:
+                entry = self.queue_operations.setdefault(name, [0, 0.0])
+                setattr(queue, name, timed(entry, function))
+        return queue
+
+    def sample(self, number_of_nodes, queue_size):
+        self.samples.append({
+            "time": time.monotonic() - self.start,
+            "number_of_nodes": number_of_nodes,
+            "queue_size": queue_size,
+            "history_size": sum(len(history) for history in self.histories),
+            })
+
+    def start_layer(self):
+        self.layer_start = time.monotonic()
+
+    def layer(self, queue_size, depth, number_of_nodes, next_layer_size):
+        now = time.monotonic()
+        self.layers.append({
+            "time": now - self.start,
+            "duration": now - self.layer_start,
+            "queue_size": queue_size,
+            "depth": depth,
+            "number_of_nodes": number_of_nodes,
+            "next_layer_size": next_layer_size,
+            })
+
+    def to_dict(self):
+        histories = self.histories
+        return {
+                "callbacks": {
+                    name: {"number_of_calls": entry[0], "time": entry[1]}
+                    for name, entry in self.callbacks.items()
+                    if entry[0] > 0},
+                "queue": {
+                    name: {"number_of_calls": entry[0], "time": entry[1]}
+                    for name, entry in self.queue_operations.items()
+                    if entry[0] > 0},
+                "history": {
+                    "number_of_insertions": sum(
+                        h.number_of_insertions for h in histories),
+                    "number_of_dominated_nodes": sum(
+                        h.number_of_dominated_nodes for h in histories),
+                    "number_of_removed_dominated_nodes": sum(
+                        h.number_of_removed_dominated_nodes
+                        for h in histories),
+                    "number_of_removals": sum(
+                        h.number_of_removals for h in histories),
+                    "time": sum(h.time for h in histories),
+                    },
+                "samples": self.samples,
+                "layers": self.layers,
+                }
+
+    def report(self, output):
+        """Add the statistics to the output of an algorithm and send them to
+        the sink."""
+        statistics = self.to_dict()
+        output["statistics"] = statistics
+        if self.sink is not None:
+            self.sink(statistics)
+
+
+def setup_statistics(branching_scheme, parameters):
+    """Return the branching scheme and the statistics used by an algorithm.
+
+    If the 'statistics' parameter is not set, the branching scheme is
+    returned unchanged and the statistics are None.
+
+    """
+    statistics = parameters.get("statistics", None)
+    if statistics is None or statistics is False:
+        return branching_scheme, None
+    statistics = Statistics(None if statistics is True else statistics)
+    return statistics.instrument(branching_scheme), statistics